@@ -1,66 +1,38 @@
 import os
-from langchain_community.chat_models import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import rules
+import metrics
+import llm
+from cache import AnalysisCache, InflightRequests, make_cache_key
+from criteria import registry as criteria_registry
+from llm import extract_json, get_backend
+from streaming import RESULT_FIELDS, ResultStreamParser
 
 # Check if OpenAI API key is set
 if "OPENAI_API_KEY" not in os.environ:
     print("Warning: OPENAI_API_KEY environment variable not set")
 
-def analyze_cv(cv_text, criteria_text=None):
-    """
-    Analyze a CV against specified criteria
-    
-    Args:
-        cv_text (str): The extracted text from the CV
-        criteria_text (str): The criteria to evaluate against (What does good look like)
-        
-    Returns:
-        dict: Analysis results including pass/fail and confidence score
-    """
-    # If no criteria provided, try to load from file
-    if not criteria_text:
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        criteria_path = os.path.join(base_dir, 'data', 'criteria.json')
-        if os.path.exists(criteria_path):
-            with open(criteria_path, 'r') as f:
-                criteria_data = json.load(f)
-                criteria_text = criteria_data.get('criteria', '')
-    
-    # If still no criteria, use a default
-    if not criteria_text:
-        criteria_text = """
-        What good looks like in a QA Engineer:
-
-        Has a shift left mentality, focusing on risk mitigation by identifying potential defects early in the process. Is quality-focused, considering testability across all phases of the software development life cycle. Deep knowledge of test methodologies and can apply that knowledge appropriately in a wide array of contexts. [QUALITY FOCUSED]
-        
-        Has a wide range of testing skills, knows when and where to apply them, and when to take a different approach. Has a deep appreciation for a wide range of non-functional testing concerns. Can collaborate and support the team to define non-functional requirements and enable implementation. [TESTING KNOWLEDGE]
-        
-        Is team focused and seeks to enable them to deliver quality products / services. Sees testing as a team activity and can facilitate and coordinate these tasks. Not only shares knowledge but receives it. Acts as a catalyst for mediation and collaboration within the team. [COLLABORATIVE]
-        
-        Can call upon a wide range of testing tools, is framework agnostic and has the ability to decide on the right tool for the use case. Can contribute to discussions regarding application architecture and understand the implications of those decisions on quality. Has an appreciation for the benefits of continuous delivery and continuous integration. Can contribute to the implementation and design of high quality pipelines. [TEST ARCHITECTURE, TOOLING AND PIPELINE]
-        
-        Has experience with multiple languages and can adopt new ones quickly. Understands modern coding practices and appreciates clean code. Has experience contributing to production and test code bases. Has debugging and diagnostic experience. Works with the team getting involved in collaborative programming. [DEVELOPMENT SKILLS]
-        
-        Is pragmatic, adaptable, self organizing and knows how much to test and when to stop. Does not become a quality gateway. Enabling the team's needs with their expertise and seeking help when required. Able to work independently and asynchronously of others. [ADAPTABLE]
-        
-        Helps clients navigate the journey towards their goals. Shows empathy for the client's current position and the journey that they have taken. They understand the why and know how to deliver value. They have a holistic awareness of the clients needs to enable them to deliver the right solution. Demonstrates diplomacy and actively seeks to help the client. [CLIENT FOCUSED]
-        
-        Has an analytical mindset and is naturally inquisitive. Pays attention to detail and demonstrates the ability to zoom out to the holistic view. Is well organized and consistent. Has a passion for continual learning and is able to pick up on new technologies, frameworks and domains quickly. [ANALYTICAL]
-        
-        Actively shares concepts such as ways of working, new tools and techniques with the team, the client and the wider network. Seeks advice when needed. Continually looking for opportunities to coach/mentor others and gets involved in facilitating or creating communities. [COMMUNITY]
-        """
-    
-    # Prepare the prompt template
-    template = """
+# Bump whenever the prompt template changes so stale cached analyses are not reused
+PROMPT_VERSION = "2"
+
+# "single" asks for the whole assessment in one completion; "per_category" runs one
+# small completion per category concurrently and decides PASS/FAIL locally
+ANALYSIS_MODE = os.environ.get('ANALYSIS_MODE', 'single').lower()
+CATEGORY_CONCURRENCY = int(os.environ.get('CATEGORY_CONCURRENCY', 9))
+CATEGORY_RETRIES = int(os.environ.get('CATEGORY_RETRIES', 1))
+
+analysis_cache = AnalysisCache.from_env()
+# Identical analyses already running in this process are waited on rather than repeated
+_inflight = InflightRequests()
+_category_executor = ThreadPoolExecutor(max_workers=CATEGORY_CONCURRENCY, thread_name_prefix='cv-category')
+
+# Prompts are laid out as a static prefix (instructions and criteria, rendered once per
+# criteria version) followed by the CV, so provider-side prompt caching can reuse the prefix
+ANALYSIS_TEMPLATE = """
     You are a thorough and fair technical recruiter specializing in Quality Assurance Engineer roles. You have high standards but also recognize that CVs often don't capture every detail of a candidate's experience.
     
-    Below is the text extracted from a candidate's CV:
-    
-    {cv_text}
-    
-    And here are the criteria for what makes a good QA Engineer candidate:
+    Here are the criteria for what makes a good QA Engineer candidate:
     
     {criteria_text}
     
@@ -150,32 +122,237 @@ def analyze_cv(cv_text, criteria_text=None):
             }}
         }}
     }}
+    """
+
+CATEGORY_TEMPLATE = """
+    You are a thorough and fair technical recruiter specializing in Quality Assurance Engineer roles. You have high standards but also recognize that CVs often don't capture every detail of a candidate's experience.
+    
+    CATEGORY UNDER REVIEW: {category}
+    
+    What good looks like for this category:
+    
+    {description}
+    
+    Rate the evidence in the CV below for this category only, using exactly one of:
+    - Strong evidence (MUST have specific examples with measurable outcomes or achievements)
+    - Moderate evidence (mentioned with some context or can be reasonably inferred)
+    - Weak evidence (briefly mentioned without context)
+    - No evidence (not addressed at all)
+    
+    IMPORTANT: For "Strong evidence" rating, the CV MUST contain concrete examples with specific details, not just generic statements.
+    
+    Format your response as a JSON object with the following structure:
+    {{
+        "rating": "Strong evidence/Moderate evidence/Weak evidence/No evidence",
+        "assessment": "Two or three sentences citing the CV evidence for this category"
+    }}
+    """
+
+CV_TEMPLATE = """
+    Below is the text extracted from a candidate's CV:
+    
+    {cv_text}
     
     Return ONLY the JSON object, nothing else.
     """
+
+PROMPT_TEMPLATES = {
+    'analysis': (ANALYSIS_TEMPLATE, ["criteria_text"]),
+    'category': (CATEGORY_TEMPLATE, ["category", "description"]),
+    'cv': (CV_TEMPLATE, ["cv_text"]),
+}
+_prompts = {}
+
+
+def get_prompt(name):
+    """
+    Return the PromptTemplate called name, built once on first use.
     
-    prompt = PromptTemplate(
-        input_variables=["cv_text", "criteria_text"],
-        template=template
-    )
+    LangChain takes most of a second to import, so it is only loaded when the
+    first analysis needs it (or by warmup.py), keeping start-up and the health
+    check fast.
+    """
+    prompt = _prompts.get(name)
+    if prompt is None:
+        from langchain.prompts import PromptTemplate
+        template, input_variables = PROMPT_TEMPLATES[name]
+        prompt = _prompts[name] = PromptTemplate(input_variables=input_variables, template=template)
+    return prompt
+
+def analyze_cv(cv_text, criteria_text=None):
+    """
+    Analyze a CV against specified criteria
     
-    try:
-        # Check if OpenAI API key is properly set
-        if not os.environ.get("OPENAI_API_KEY") or os.environ.get("OPENAI_API_KEY").startswith("sk-your-"):
-            raise ValueError("OpenAI API key is not properly configured. Please add a valid API key to the .env file.")
-            
-        # Initialize with ChatOpenAI which is compatible with current models
-        llm = ChatOpenAI(temperature=0.3, model_name="gpt-3.5-turbo")
+    Args:
+        cv_text (str): The extracted text from the CV
+        criteria_text (str): The criteria to evaluate against (What does good look like)
         
-        # Create and run the chain
-        chain = LLMChain(llm=llm, prompt=prompt)
-        response = chain.run(cv_text=cv_text, criteria_text=criteria_text)
+    Returns:
+        dict: Analysis results including pass/fail and confidence score
+    """
+    result, _ = analyze_cv_cached(cv_text, criteria_text)
+    return result
+
+
+def analyze_cv_cached(cv_text, criteria_text=None):
+    """
+    Analyze a CV, serving repeated CV/criteria pairs from the analysis cache
+    
+    Returns:
+        tuple: (result dict, True if the result came from the cache or from an
+        identical analysis that was already in flight)
+    """
+    criteria = criteria_registry.resolve(criteria_text)
+    key = make_cache_key(cv_text, criteria.version, get_backend().model_name, f"{PROMPT_VERSION}:{ANALYSIS_MODE}")
+    
+    with metrics.timer('cache'):
+        cached = analysis_cache.get(key)
+    if cached is not None:
+        return cached, True
+    
+    result, shared = _inflight.run(key, run_and_cache, key, cv_text, criteria)
+    if shared:
+        metrics.llm_calls.inc('coalesced')
+    return result, shared
+
+
+def run_and_cache(key, cv_text, criteria):
+    result = run_analysis(cv_text, criteria)
+    
+    # Never cache failures, the next attempt may well succeed
+    if result.get('decision') != 'ERROR':
+        analysis_cache.set(key, result)
+    
+    return result
+
+
+def stream_analysis(cv_text, criteria_text=None):
+    """
+    Analyze a CV, yielding events as parts of the result become available
+    
+    Yields one event per result field ('decision', 'confidence', 'strengths', ...)
+    and one 'category' event per category assessment, as soon as each is complete,
+    then a final 'result' event with the validated result. The early decision is
+    the model's own; the rule check can still turn a PASS into a FAIL in the final
+    result. Cached results are replayed as the same sequence of events.
+    """
+    criteria = criteria_registry.resolve(criteria_text)
+    key = make_cache_key(cv_text, criteria.version, get_backend().model_name, f"{PROMPT_VERSION}:{ANALYSIS_MODE}")
+    
+    with metrics.timer('cache'):
+        cached = analysis_cache.get(key)
+    if cached is not None:
+        yield from result_events(cached)
+        yield {'type': 'result', 'result': cached, 'cached': True}
+        return
+    
+    if ANALYSIS_MODE == 'per_category':
+        result = yield from stream_category_analysis(cv_text, criteria)
+    else:
+        result = yield from stream_single_analysis(cv_text, criteria)
+    
+    if result.get('decision') != 'ERROR':
+        analysis_cache.set(key, result)
+    
+    yield {'type': 'result', 'result': result, 'cached': False}
+
+
+def stream_single_analysis(cv_text, criteria):
+    """Relay field events while the completion streams in. Returns the validated result"""
+    try:
+        prompt = criteria.prefix('analysis', render_analysis_prefix) + get_prompt('cv').format(cv_text=cv_text)
+        parser = ResultStreamParser()
+        started = time.perf_counter()
+        first_chunk = True
+        for chunk in llm.stream(prompt):
+            if first_chunk:
+                metrics.record_stage('llm_first_token', time.perf_counter() - started)
+                first_chunk = False
+            for name, value in parser.feed(chunk):
+                yield field_event(name, value)
+        metrics.record_stage('llm', time.perf_counter() - started)
         
-        # Parse the JSON response
-        result = json.loads(response)
+        with metrics.timer('parse'):
+            result = extract_json(parser.text)
+            return validate_and_correct_result(result)
+    
+    except Exception as e:
+        print(f"Error analyzing CV: {e}")
+        return fallback_response(str(e))
+
+
+def stream_category_analysis(cv_text, criteria):
+    """Yield each category as its own call finishes, then the locally decided fields. Returns the result"""
+    futures = {
+        _category_executor.submit(assess_category, cv_text, category, criteria): category
+        for category in rules.CATEGORIES
+    }
+    
+    assessments, errors = {}, []
+    for future in as_completed(futures):
+        category = futures[future]
+        try:
+            assessments[category] = future.result()
+            yield field_event('category', (category, assessments[category]))
+        except Exception as e:
+            errors.append(f"{category}: {e}")
+    
+    if errors:
+        print(f"Error analyzing CV categories: {errors}")
+        return fallback_response("Could not assess " + "; ".join(errors))
+    
+    result = build_category_result(assessments)
+    for name in RESULT_FIELDS:
+        yield field_event(name, result[name])
+    return result
+
+
+def result_events(result):
+    """Field events for an already complete result"""
+    for name in RESULT_FIELDS:
+        if name in result:
+            yield field_event(name, result[name])
+    for category, assessment in (result.get('category_assessments') or {}).items():
+        yield field_event('category', (category, assessment))
+
+
+def field_event(name, value):
+    if name == 'category':
+        return {'type': 'category', 'category': value[0], 'assessment': value[1]}
+    return {'type': name, name: value}
+
+
+def resolve_criteria(criteria_text=None):
+    """Return criteria_text, falling back to the criteria in data/criteria.json"""
+    return criteria_registry.resolve(criteria_text).text
+
+
+def render_analysis_prefix(criteria):
+    return get_prompt('analysis').format(criteria_text=criteria.text)
+
+
+def render_category_prefix(category):
+    def render(criteria):
+        description = criteria.descriptions.get(category, criteria.text)
+        return get_prompt('category').format(category=category, description=description)
+    return render
+
+
+def run_analysis(cv_text, criteria):
+    """Run the LLM analysis for a CV against a resolved CriteriaVersion"""
+    if ANALYSIS_MODE == 'per_category':
+        return run_category_analysis(cv_text, criteria)
+    
+    try:
+        # The backend is shared across requests and reuses pooled connections
+        prompt = criteria.prefix('analysis', render_analysis_prefix) + get_prompt('cv').format(cv_text=cv_text)
+        with metrics.timer('llm'):
+            response = llm.complete(prompt)
         
-        # Validate the result against our rules
-        return validate_and_correct_result(result)
+        # Parse the JSON response and validate the result against our rules
+        with metrics.timer('parse'):
+            result = extract_json(response)
+            return validate_and_correct_result(result)
     
     except Exception as e:
         print(f"Error analyzing CV: {e}")
@@ -183,6 +360,88 @@ def analyze_cv(cv_text, criteria_text=None):
         return fallback_response(str(e))
 
 
+def run_category_analysis(cv_text, criteria):
+    """Assess every category with its own concurrent LLM call and decide locally with the rule engine"""
+    futures = {
+        category: _category_executor.submit(assess_category, cv_text, category, criteria)
+        for category in rules.CATEGORIES
+    }
+    
+    assessments, errors = {}, []
+    for category, future in futures.items():
+        try:
+            assessments[category] = future.result()
+        except Exception as e:
+            errors.append(f"{category}: {e}")
+    
+    if errors:
+        print(f"Error analyzing CV categories: {errors}")
+        # Categories that did succeed stay cached, so a resubmission only redoes the failed ones
+        return fallback_response("Could not assess " + "; ".join(errors))
+    
+    return build_category_result(assessments)
+
+
+def assess_category(cv_text, category, criteria):
+    """Rate a single category, retrying it on its own if the call or its JSON fails"""
+    prefix = criteria.prefix(f'category:{category}', render_category_prefix(category))
+    key = make_cache_key(cv_text, prefix, get_backend().model_name, f"{PROMPT_VERSION}:category:{category}")
+    cached = analysis_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    assessment, shared = _inflight.run(key, run_category_call, key, cv_text, category, prefix)
+    if shared:
+        metrics.llm_calls.inc('coalesced')
+    return assessment
+
+
+def run_category_call(key, cv_text, category, prefix):
+    prompt = prefix + get_prompt('cv').format(cv_text=cv_text)
+    last_error = None
+    for attempt in range(CATEGORY_RETRIES + 1):
+        try:
+            with metrics.timer('llm_category'):
+                response = llm.complete(prompt)
+            data = extract_json(response)
+            assessment = {
+                "rating": rules.normalize_rating(data.get("rating")),
+                "assessment": str(data.get("assessment", ""))
+            }
+            analysis_cache.set(key, assessment)
+            return assessment
+        except Exception as e:
+            print(f"Error assessing {category} (attempt {attempt + 1}): {e}")
+            metrics.errors.inc('category_attempt')
+            last_error = e
+    raise last_error
+
+
+def build_category_result(assessments):
+    """Build the standard result structure from per-category assessments"""
+    evaluation = rules.evaluate(assessments)
+    ratings = evaluation['ratings']
+    
+    def label(category):
+        return category.replace('_', ' ').title()
+    
+    # Weakest first, so the most important gaps lead the list
+    rank = {rules.NO_EVIDENCE: 0, rules.WEAK: 1, rules.MODERATE: 2}
+    gaps = sorted((c for c in rules.CATEGORIES if ratings[c] != rules.STRONG), key=lambda c: rank[ratings[c]])
+    
+    justification = [f"Strong evidence in {evaluation['strong_count']} of {len(rules.CATEGORIES)} categories"]
+    justification += evaluation['failed_rules'] or ["All pass rules are met"]
+    
+    return {
+        "decision": evaluation['decision'],
+        "confidence": evaluation['confidence'],
+        "justification": justification,
+        "strengths": [f"{label(c)}: {assessments[c]['assessment']}" for c in rules.CATEGORIES if ratings[c] == rules.STRONG][:3],
+        "improvement_areas": [f"{label(c)} ({ratings[c].lower()}): {assessments[c]['assessment']}" for c in gaps][:3],
+        "category_assessments": assessments
+    }
+
+
 def validate_and_correct_result(result):
     """
     Validates the AI-generated result against our rules and corrects it if necessary.
@@ -196,25 +455,22 @@ def validate_and_correct_result(result):
         # Check if we have category assessments to validate
         if 'category_assessments' not in result:
             return result
-            
-        # Check if any category has 'Weak evidence' or 'No evidence'
-        has_weak_or_no_evidence = False
-        for category, assessment in result['category_assessments'].items():
-            if assessment.get('evidence_level') in ['Weak evidence', 'No evidence']:
-                has_weak_or_no_evidence = True
-                break
+        
+        evaluation = rules.evaluate(result['category_assessments'])
         
         # Store original decision to check if it changes
-        original_decision = result.get('decision')
+        original_decision = str(result.get('decision', '')).upper()
+        result['decision'] = original_decision
         
-        # If there's weak or no evidence in any category, ensure the decision is 'Fail'
-        if has_weak_or_no_evidence and original_decision == 'Pass':
-            # Change the decision to Fail
-            result['decision'] = 'Fail'
+        # The rules are necessary conditions for a PASS, so a PASS that breaks any of them becomes a FAIL
+        if original_decision == 'PASS' and evaluation['decision'] == 'FAIL':
+            result['decision'] = 'FAIL'
+            result['confidence'] = evaluation['confidence']
+            metrics.errors.inc('rule_correction')
             
             # Add a note about the correction
             if 'justification' in result:
-                correction_note = "[NOTE: This assessment was automatically corrected to follow the strict evaluation criteria. Any category with 'Weak evidence' or 'No evidence' results in an automatic fail.]"
+                correction_note = "[NOTE: This assessment was automatically corrected to follow the strict evaluation criteria. Rules not met: " + "; ".join(evaluation['failed_rules']) + ".]"
                 
                 # Handle different justification formats
                 if isinstance(result['justification'], list):
@@ -234,6 +490,7 @@ def validate_and_correct_result(result):
 
 
 def fallback_response(error_msg):
+    metrics.errors.inc('analysis_fallback')
     return {
         "decision": "ERROR",
         "confidence": 0,
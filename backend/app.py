@@ -1,32 +1,147 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
 import os
+import io
+import time
 import uuid
 import json
+import zipfile
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from werkzeug.utils import secure_filename
 import extractors
-from analyzer import analyze_cv
+import jobs
+import metrics
+import preprocess
+import prescreen
+import uploads
+import results_store
+from analyzer import analyze_cv_cached, analysis_cache, resolve_criteria, stream_analysis
+from criteria import registry as criteria_registry
+from jobs import JobQueue, QueueFullError
 
 app = Flask(__name__)
 CORS(app, origins=["https://richph9531.github.io", "http://localhost:3000"], supports_credentials=True)
 
 # Configure upload folder
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-UPLOAD_FOLDER = os.path.join(BASE_DIR, 'data', 'uploads')
-RESULTS_FOLDER = os.path.join(BASE_DIR, 'data', 'results')
-CRITERIA_FILE = os.path.join(BASE_DIR, 'data', 'criteria.json')
+UPLOAD_FOLDER = uploads.UPLOAD_FOLDER
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'txt'}
 
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(RESULTS_FOLDER, exist_ok=True)
-
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload size
 
+# Opt-in background processing for /api/upload (see JOB_WORKERS / JOB_MAX_PENDING)
+ASYNC_UPLOADS = os.environ.get('ASYNC_UPLOADS', 'false').lower() == 'true'
+job_queue = JobQueue.from_env()
+
+# Results live in SQLite by default (RESULTS_STORE=json keeps one file per result)
+store = results_store.create_store()
+
+# Bulk screening limits for /api/batch
+BATCH_CONCURRENCY = int(os.environ.get('BATCH_CONCURRENCY', 4))
+BATCH_MAX_FILES = int(os.environ.get('BATCH_MAX_FILES', 500))
+# Total uncompressed size of a batch, checked against zip headers before anything is unpacked
+BATCH_MAX_TOTAL_MB = int(os.environ.get('BATCH_MAX_TOTAL_MB', 100))
+
+@app.before_request
+def start_request_timing():
+    g.started = time.perf_counter()
+    metrics.start_request()
+
+@app.after_request
+def finish_request_timing(response):
+    started = g.get('started', time.perf_counter())
+    endpoint = request.endpoint or 'unknown'
+    timing = metrics.server_timing()
+    if response.is_streamed:
+        # Streamed bodies are generated after this hook, once the headers are sent,
+        # so time the request when the response closes and leave out Server-Timing
+        response.call_on_close(lambda: metrics.request_seconds.observe(
+            time.perf_counter() - started, endpoint, response.status_code))
+        return response
+    
+    elapsed = time.perf_counter() - started
+    metrics.request_seconds.observe(elapsed, endpoint, response.status_code)
+    if timing:
+        response.headers['Server-Timing'] = f"{timing}, total;dur={elapsed * 1000:.1f}"
+    return response
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def async_requested():
+    """Uploads run in the background when ASYNC_UPLOADS is set or the client asks for it"""
+    flag = request.args.get('async', request.form.get('async', ''))
+    if flag:
+        return flag.lower() in ('1', 'true', 'yes')
+    return ASYNC_UPLOADS
+
+def process_cv(file_id, original_filename, data, extension, criteria):
+    """Extract, analyze and persist an in-memory upload. Returns (result, cache_hit)"""
+    cv_text, preprocessing = prepare_cv(file_id, data, extension)
+    return analyze_and_store(file_id, original_filename, cv_text, preprocessing, criteria)
+
+def prepare_cv(file_id, data, extension):
+    """Optionally keep the raw upload and its text, then extract and preprocess it. Returns (cv_text, preprocessing)"""
+    # Raw files are only kept on disk when KEEP_UPLOADS is enabled
+    if uploads.KEEP_UPLOADS:
+        with metrics.timer('upload_save'):
+            uploads.save_upload(data, file_id, extension)
+    
+    # Extract text from CV
+    try:
+        cv_text = extractors.extract_text_from_bytes(data, extension)
+    except extractors.ExtractionError:
+        metrics.errors.inc('extraction')
+        raise
+    
+    # Extracted text is only kept when KEEP_CV_TEXT is enabled, for offline re-scoring
+    uploads.save_text(cv_text, file_id)
+    
+    # Strip layout noise and fit the CV into the prompt token budget
+    with metrics.timer('preprocess'):
+        cv_text, preprocessing = preprocess.prepare_cv_text(cv_text)
+    metrics.cv_tokens.inc('before', amount=preprocessing['tokens_before'])
+    metrics.cv_tokens.inc('after', amount=preprocessing['tokens_after'])
+    return cv_text, preprocessing
+
+def analyze_and_store(file_id, original_filename, cv_text, preprocessing, criteria):
+    """Analyze prepared CV text, unless the pre-screen rejects it, and persist the result"""
+    screening = run_prescreen(cv_text, criteria)
+    
+    if screening and screening['reject']:
+        result, cache_hit = prescreen.rejection_result(screening), False
+    else:
+        result, cache_hit = analyze_cv_cached(cv_text, criteria)
+    
+    save_result(file_id, original_filename, criteria, preprocessing, result, screening)
+    
+    return result, cache_hit
+
+def run_prescreen(cv_text, criteria):
+    """Return the pre-screen assessment, or None when the pre-screen is disabled"""
+    if prescreen.PRESCREEN_ENABLED:
+        with metrics.timer('prescreen'):
+            return prescreen.screen(cv_text, resolve_criteria(criteria))
+    return None
+
+def save_result(file_id, original_filename, criteria, preprocessing, result, screening=None):
+    result_data = {
+        'id': file_id,
+        'original_filename': original_filename,
+        'timestamp': datetime.now().isoformat(),
+        'criteria_version': criteria_registry.resolve(criteria).version,
+        'preprocessing': preprocessing,
+        'result': result
+    }
+    if screening:
+        result_data['prescreen'] = screening
+    
+    with metrics.timer('store'):
+        store.save(result_data)
+    metrics.decisions.inc(str(result.get('decision', 'ERROR')).upper())
+
 @app.route('/api/upload', methods=['POST'])
 def upload_cv():
     if 'file' not in request.files:
@@ -42,20 +157,28 @@ def upload_cv():
         file_id = str(uuid.uuid4())
         original_filename = secure_filename(file.filename)
         extension = original_filename.rsplit('.', 1)[1].lower()
-        filename = f"{file_id}.{extension}"
-        
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        
-        # Extract text from CV
-        cv_text = extractors.extract_text(filepath, extension)
+        data = file.read()
         
         # Get criteria from request
         criteria = request.form.get('criteria', '')
         
+        if async_requested():
+            try:
+                job_queue.submit(file_id, process_cv, file_id, original_filename, data, extension, criteria)
+            except QueueFullError as e:
+                return jsonify({'error': str(e)}), 503
+            
+            return jsonify({
+                'id': file_id,
+                'filename': original_filename,
+                'status': jobs.QUEUED
+            }), 202
+        
         # Analyze CV against criteria
         try:
-            result = analyze_cv(cv_text, criteria)
+            result, cache_hit = process_cv(file_id, original_filename, data, extension, criteria)
+        except extractors.ExtractionError as e:
+            return jsonify({'error': f'Could not read this CV: {e}'}), 422
         except ValueError as e:
             if "OpenAI API key" in str(e):
                 return jsonify({
@@ -63,36 +186,277 @@ def upload_cv():
                 }), 500
             raise
         
-        # Save result
-        result_data = {
-            'id': file_id,
-            'original_filename': original_filename,
-            'timestamp': datetime.now().isoformat(),
-            'result': result
-        }
-        
-        result_path = os.path.join(RESULTS_FOLDER, f"{file_id}.json")
-        with open(result_path, 'w') as f:
-            json.dump(result_data, f)
-        
         return jsonify({
             'id': file_id,
             'filename': original_filename,
-            'result': result
+            'result': result,
+            'cached': cache_hit
         })
     
     return jsonify({'error': 'File type not allowed'}), 400
 
+def sse_event(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+@app.route('/api/upload/stream', methods=['POST'])
+def upload_cv_stream():
+    """
+    Analyze one CV and stream the result as Server-Sent Events.
+    
+    A 'start' event carries the result id, then each result field and category
+    assessment is sent as soon as the model has finished writing it. The final
+    'result' event carries the validated result, which is persisted exactly as
+    /api/upload would.
+    """
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file part'}), 400
+    
+    file = request.files['file']
+    
+    if file.filename == '':
+        return jsonify({'error': 'No selected file'}), 400
+    if not allowed_file(file.filename):
+        return jsonify({'error': 'File type not allowed'}), 400
+    
+    file_id = str(uuid.uuid4())
+    original_filename = secure_filename(file.filename)
+    extension = original_filename.rsplit('.', 1)[1].lower()
+    criteria = request.form.get('criteria', '')
+    
+    # Extraction errors still get a proper status code, before the stream starts
+    try:
+        cv_text, preprocessing = prepare_cv(file_id, file.read(), extension)
+    except extractors.ExtractionError as e:
+        return jsonify({'error': f'Could not read this CV: {e}'}), 422
+    
+    def generate():
+        yield sse_event({'type': 'start', 'id': file_id, 'filename': original_filename})
+        
+        screening = run_prescreen(cv_text, criteria)
+        if screening and screening['reject']:
+            events = iter([{'type': 'result', 'result': prescreen.rejection_result(screening), 'cached': False}])
+        else:
+            events = stream_analysis(cv_text, criteria)
+        
+        for event in events:
+            if event['type'] == 'result':
+                save_result(file_id, original_filename, criteria, preprocessing, event['result'], screening)
+                event = {**event, 'id': file_id, 'filename': original_filename}
+            yield sse_event(event)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+class BatchLimitError(Exception):
+    """Raised when a batch holds more files or more data than the BATCH_* limits allow"""
+
+def collect_batch_files():
+    """
+    Return (items, skipped) for the CVs in the request, unpacking zips.
+    
+    items are (original_filename, extension, data); skipped are (filename, error)
+    for zip members over the upload size limit. The file count and total size
+    are checked from the zip directories before any member is decompressed.
+    """
+    max_file_size = app.config['MAX_CONTENT_LENGTH']
+    pending, skipped = [], []
+    with ExitStack() as stack:
+        for file in request.files.getlist('files') + request.files.getlist('file'):
+            if not file or file.filename == '':
+                continue
+            original_filename = secure_filename(file.filename)
+            if original_filename.lower().endswith('.zip'):
+                archive = stack.enter_context(zipfile.ZipFile(io.BytesIO(file.read())))
+                for member in archive.infolist():
+                    name = secure_filename(os.path.basename(member.filename))
+                    if member.is_dir() or member.filename.startswith('__MACOSX') or not allowed_file(name):
+                        continue
+                    if member.file_size > max_file_size:
+                        skipped.append((name, f"File is larger than {max_file_size // (1024 * 1024)}MB"))
+                        continue
+                    pending.append((name, member.file_size, archive, member))
+            elif allowed_file(original_filename):
+                data = file.read()
+                pending.append((original_filename, len(data), None, data))
+        
+        if len(pending) > BATCH_MAX_FILES:
+            raise BatchLimitError(f'Too many files in batch (maximum {BATCH_MAX_FILES})')
+        if sum(size for _, size, _, _ in pending) > BATCH_MAX_TOTAL_MB * 1024 * 1024:
+            raise BatchLimitError(f'Batch is larger than {BATCH_MAX_TOTAL_MB}MB uncompressed')
+        
+        items = [(name, name.rsplit('.', 1)[1].lower(), read_zip_member(archive, source) if archive else source)
+                 for name, _, archive, source in pending]
+    return items, skipped
+
+def read_zip_member(archive, member):
+    # A sized read inflates no more than the declared size (ZipFile.read inflates the
+    # whole stream before trimming it), and a member whose header understates its
+    # size then fails the CRC check with BadZipFile
+    with archive.open(member) as f:
+        return f.read(member.file_size)
+
+def batch_event(file_id, original_filename, result, cache_hit):
+    return {
+        'type': 'result',
+        'id': file_id,
+        'filename': original_filename,
+        'decision': result.get('decision'),
+        'confidence': result.get('confidence'),
+        'cached': cache_hit,
+        'prescreened': bool(result.get('prescreened')),
+        'result': result
+    }
+
+def process_batch_item(original_filename, extension, data, criteria):
+    """Run one batch CV through the standard pipeline"""
+    file_id = str(uuid.uuid4())
+    result, cache_hit = process_cv(file_id, original_filename, data, extension, criteria)
+    return batch_event(file_id, original_filename, result, cache_hit)
+
+def analyze_batch_item(file_id, original_filename, cv_text, preprocessing, criteria):
+    """Analyze one already-prepared batch CV"""
+    result, cache_hit = analyze_and_store(file_id, original_filename, cv_text, preprocessing, criteria)
+    return batch_event(file_id, original_filename, result, cache_hit)
+
+@app.route('/api/batch', methods=['POST'])
+def batch_upload():
+    """
+    Screen many CVs in one request (multiple 'files' parts and/or zip archives).
+    
+    Results stream back as NDJSON, or as Server-Sent Events with ?format=sse,
+    in completion order, followed by a summary event. With ?rank=true every CV
+    is extracted first and analyzed in pre-screen score order, so the most
+    promising candidates come back first.
+    """
+    try:
+        items, skipped = collect_batch_files()
+    except zipfile.BadZipFile:
+        return jsonify({'error': 'Invalid zip archive'}), 400
+    except BatchLimitError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if not items and not skipped:
+        return jsonify({'error': 'No supported files found'}), 400
+    
+    criteria = request.form.get('criteria', '')
+    use_sse = request.args.get('format', '').lower() == 'sse'
+    rank_batch = request.args.get('rank', '').lower() in ('1', 'true', 'yes')
+    
+    def encode(event):
+        if use_sse:
+            return sse_event(event)
+        return json.dumps(event) + '\n'
+    
+    def generate():
+        started = time.time()
+        summary = {'type': 'summary', 'total': len(items) + len(skipped), 'passed': 0, 'failed': 0, 'errors': 0, 'llm_calls_skipped': 0}
+        executor = ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY, thread_name_prefix='cv-batch')
+        
+        def record(event):
+            decision = (event.get('decision') or '').upper()
+            if decision == 'PASS':
+                summary['passed'] += 1
+            elif decision == 'FAIL':
+                summary['failed'] += 1
+            else:
+                summary['errors'] += 1
+            if event.get('prescreened'):
+                summary['llm_calls_skipped'] += 1
+            return encode(event)
+        
+        try:
+            for name, error in skipped:
+                yield record({'type': 'error', 'filename': name, 'error': error})
+            
+            if rank_batch:
+                prepared = []
+                futures = {}
+                for name, extension, data in items:
+                    file_id = str(uuid.uuid4())
+                    futures[executor.submit(prepare_cv, file_id, data, extension)] = (file_id, name)
+                for future in as_completed(futures):
+                    file_id, name = futures[future]
+                    try:
+                        cv_text, preprocessing = future.result()
+                        prepared.append((file_id, name, cv_text, preprocessing))
+                    except Exception as e:
+                        print(f"Error processing batch file {name}: {e}")
+                        yield record({'type': 'error', 'filename': name, 'error': str(e)})
+                
+                # Submitted in rank order, so the pool picks up the strongest CVs first
+                order = prescreen.rank([entry[2] for entry in prepared], resolve_criteria(criteria))
+                futures = {
+                    executor.submit(analyze_batch_item, *prepared[index][:4], criteria): prepared[index][1]
+                    for index in order
+                }
+            else:
+                futures = {
+                    executor.submit(process_batch_item, name, extension, data, criteria): name
+                    for name, extension, data in items
+                }
+            
+            for future in as_completed(futures):
+                try:
+                    event = future.result()
+                except Exception as e:
+                    print(f"Error processing batch file {futures[future]}: {e}")
+                    event = {'type': 'error', 'filename': futures[future], 'error': str(e)}
+                yield record(event)
+            
+            elapsed = time.time() - started
+            summary['elapsed_seconds'] = round(elapsed, 3)
+            summary['cvs_per_second'] = round(len(items) / elapsed, 3) if elapsed else None
+            yield encode(summary)
+        finally:
+            # Stop queued work if the client goes away mid-stream
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    mimetype = 'text/event-stream' if use_sse else 'application/x-ndjson'
+    return Response(generate(), mimetype=mimetype, headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/results', methods=['GET'])
+def list_results():
+    """Paginated result summaries, newest first, filterable by decision, date range, filename and criteria version"""
+    try:
+        page = max(1, int(request.args.get('page', 1)))
+        per_page = min(results_store.MAX_PAGE_SIZE, max(1, int(request.args.get('per_page', 20))))
+    except ValueError:
+        return jsonify({'error': 'page and per_page must be integers'}), 400
+    
+    try:
+        results, total = store.list(
+            page=page,
+            per_page=per_page,
+            decision=request.args.get('decision'),
+            since=request.args.get('since'),
+            until=request.args.get('until'),
+            filename=request.args.get('filename'),
+            criteria_version=request.args.get('criteria_version')
+        )
+    except ValueError:
+        return jsonify({'error': 'since and until must be ISO 8601 dates or date-times'}), 400
+    return jsonify({
+        'results': results,
+        'page': page,
+        'per_page': per_page,
+        'total': total
+    })
+
 @app.route('/api/results/<result_id>', methods=['GET'])
 def get_result(result_id):
-    result_path = os.path.join(RESULTS_FOLDER, f"{result_id}.json")
+    # Check the job before the store: a job stores its result before dropping its
+    # status, so one that finishes between the two lookups is still found
+    job = job_queue.status(result_id)
+    if job is not None and job['status'] in (jobs.QUEUED, jobs.RUNNING):
+        return jsonify({'id': result_id, 'status': job['status']}), 202
+
+    result_data = store.get(result_id)
     
-    if not os.path.exists(result_path):
+    if result_data is None:
+        if job is not None and job['status'] == jobs.ERROR:
+            return jsonify({'id': result_id, 'status': jobs.ERROR, 'error': job.get('error', 'Analysis failed')}), 500
         return jsonify({'error': 'Result not found'}), 404
     
-    with open(result_path, 'r') as f:
-        result_data = json.load(f)
-    
+    result_data['status'] = jobs.DONE
     return jsonify(result_data)
 
 @app.route('/api/criteria', methods=['POST'])
@@ -105,32 +469,35 @@ def save_criteria():
 @app.route('/api/criteria', methods=['GET'])
 def get_criteria():
     try:
-        # Check if criteria file exists, if not create it with default criteria
-        if not os.path.exists(CRITERIA_FILE):
-            # Create the directory if it doesn't exist
-            os.makedirs(os.path.dirname(CRITERIA_FILE), exist_ok=True)
-            
-            # Default QA Engineer criteria from memory
-            default_criteria = """QUALITY FOCUSED: Shift left mentality, risk mitigation, testability across SDLC, test methodology knowledge
-TESTING KNOWLEDGE: Wide range of testing skills, non-functional testing concerns, requirements definition
-COLLABORATIVE: Team-focused, sees testing as team activity, knowledge sharing, mediation
-TEST ARCHITECTURE: Tool selection, architecture discussions, CI/CD appreciation, pipeline design
-DEVELOPMENT SKILLS: Multiple languages, clean code, production/test code contributions, debugging
-ADAPTABLE: Pragmatic, self-organizing, not a quality gateway, independent work
-CLIENT FOCUSED: Empathy, value delivery, holistic awareness, diplomacy
-ANALYTICAL: Inquisitive, detail-oriented, well-organized, continuous learning
-COMMUNITY: Knowledge sharing, seeking advice, coaching/mentoring"""
-            
-            with open(CRITERIA_FILE, 'w') as f:
-                json.dump({'criteria': default_criteria}, f)
-        
-        # Now read the file (either existing or newly created)
-        with open(CRITERIA_FILE, 'r') as f:
-            data = json.load(f)
-            return jsonify(data)
+        # Served from the registry, which creates the file with the default criteria if needed
+        # and only rereads it when its mtime changes
+        criteria = criteria_registry.current()
+        return jsonify({**criteria.data, 'version': criteria.version})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(analysis_cache.stats())
+
+@app.route('/api/prescreen/stats', methods=['GET'])
+def prescreen_stats():
+    return jsonify(prescreen.stats())
+
+@app.route('/api/jobs/stats', methods=['GET'])
+def job_stats():
+    return jsonify(job_queue.stats())
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus text format: stage timings, counters and cache/queue/pre-screen gauges for this worker"""
+    body = metrics.render({
+        'cv_cache': analysis_cache.stats(),
+        'cv_jobs': job_queue.stats(),
+        'cv_prescreen': prescreen.stats(),
+    })
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'ok', 'message': 'Backend server is running'}), 200
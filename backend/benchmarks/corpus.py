@@ -0,0 +1,119 @@
+import os
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+# Pages per CV for each corpus size
+SIZES = {'small': 1, 'medium': 3, 'large': 10}
+FORMATS = ('pdf', 'docx', 'txt')
+LINES_PER_PAGE = 45
+
+ROLES = ["QA Engineer", "Senior QA Engineer", "Test Automation Engineer", "SDET", "Quality Lead", "Test Analyst"]
+COMPANIES = ["Acme Retail", "Northwind Bank", "Globex Health", "Initech", "Umbrella Logistics", "Hooli Cloud"]
+SKILLS = ["Selenium", "Cypress", "Playwright", "Python", "Java", "TypeScript", "Jenkins", "GitHub Actions",
+          "Docker", "Kubernetes", "Postman", "JMeter", "k6", "SQL", "REST APIs", "BDD", "Cucumber", "Appium"]
+ACHIEVEMENTS = [
+    "Introduced shift-left testing that cut escaped defects by {n}%",
+    "Built a {skill} regression suite of {n}0 tests running on every pull request",
+    "Reduced pipeline duration by {n}% by parallelising {skill} tests",
+    "Mentored {n} junior testers and ran a monthly testing community of practice",
+    "Led exploratory testing sessions with product owners to refine acceptance criteria",
+    "Designed performance tests with {skill} that found a {n}% throughput regression before release",
+    "Paired with developers on unit and contract tests, raising coverage to {n}%",
+    "Presented risk-based test strategy to client stakeholders for a {n}-team programme",
+]
+
+
+def cv_lines(rng, pages):
+    """Plausible CV text lines filling roughly the given number of pages"""
+    lines = ["Jordan Example", "QA Engineer | jordan@example.com | +44 7700 900000", "",
+             "PROFILE", "Quality engineer focused on preventing defects and building testable systems.", "",
+             "SKILLS", ", ".join(rng.sample(SKILLS, 8)), "", "EXPERIENCE"]
+    while len(lines) < pages * LINES_PER_PAGE:
+        start = rng.randint(2008, 2022)
+        lines += ["", f"{rng.choice(ROLES)}, {rng.choice(COMPANIES)} ({start} - {start + rng.randint(1, 4)})"]
+        for _ in range(rng.randint(4, 8)):
+            lines.append("- " + rng.choice(ACHIEVEMENTS).format(n=rng.randint(2, 9) * 5, skill=rng.choice(SKILLS)))
+    lines += ["", "EDUCATION", "BSc Computer Science, Example University", "",
+              "CERTIFICATIONS", "ISTQB Advanced Test Analyst"]
+    return lines
+
+
+def write_txt(path, lines):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+
+
+def write_docx(path, lines):
+    """Minimal WordprocessingML package: one paragraph per line"""
+    paragraphs = ''.join(f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>' for line in lines)
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml',
+                         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                         '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                         '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                         '<Default Extension="xml" ContentType="application/xml"/>'
+                         '<Override PartName="/word/document.xml" ContentType="application/'
+                         'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/></Types>')
+        archive.writestr('_rels/.rels',
+                         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                         '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                         '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+                         'relationships/officeDocument" Target="word/document.xml"/></Relationships>')
+        archive.writestr('word/document.xml',
+                         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                         '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                         f'<w:body>{paragraphs}</w:body></w:document>')
+
+
+def _pdf_string(line):
+    text = line.encode('latin-1', 'replace').decode('latin-1')
+    return '(' + text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') + ')'
+
+
+def write_pdf(path, lines):
+    """Minimal text PDF with the standard Helvetica font, LINES_PER_PAGE lines per page"""
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+    # Objects 1-3 are the catalog, page tree and font; each page adds a page and a content object
+    page_ids = [4 + 2 * index for index in range(len(pages))]
+    objects = {
+        1: '<< /Type /Catalog /Pages 2 0 R >>',
+        2: f"<< /Type /Pages /Kids [{' '.join(f'{pid} 0 R' for pid in page_ids)}] /Count {len(pages)} >>",
+        3: '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    }
+    for page_id, page_lines in zip(page_ids, pages):
+        content = 'BT /F1 10 Tf 14 TL 50 800 Td ' + ' '.join(f'{_pdf_string(line)} Tj T*' for line in page_lines) + ' ET'
+        objects[page_id] = (f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+                            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>')
+        objects[page_id + 1] = f'<< /Length {len(content.encode("latin-1"))} >>\nstream\n{content}\nendstream'
+
+    output = bytearray(b'%PDF-1.4\n')
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(output)
+        output += f'{object_id} 0 obj\n{objects[object_id]}\nendobj\n'.encode('latin-1')
+    xref = len(output)
+    output += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode('latin-1')
+    for object_id in sorted(objects):
+        output += f'{offsets[object_id]:010d} 00000 n \n'.encode('latin-1')
+    output += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode('latin-1')
+    with open(path, 'wb') as f:
+        f.write(output)
+
+
+WRITERS = {'pdf': write_pdf, 'docx': write_docx, 'txt': write_txt}
+
+
+def generate(folder, per_size=5, seed=42, formats=FORMATS):
+    """Write per_size CVs of every size in every format. Returns a list of (path, format, size) tuples"""
+    os.makedirs(folder, exist_ok=True)
+    rng = random.Random(seed)
+    corpus = []
+    for size, pages in SIZES.items():
+        for index in range(per_size):
+            lines = cv_lines(rng, pages)
+            for extension in formats:
+                path = os.path.join(folder, f"cv_{size}_{index}.{extension}")
+                WRITERS[extension](path, lines)
+                corpus.append((path, extension, size))
+    return corpus
@@ -0,0 +1,42 @@
+import os
+import time
+import extractors
+from benchmarks.stats import percentile
+
+
+def bench_extraction(corpus, repeats=3):
+    """
+    Time extractors.extract_text over the corpus, per format.
+
+    One warm-up extraction per format runs first so pool start-up is not
+    counted. Returns {format: {files, mb, seconds, files_per_second,
+    mb_per_second, p50_ms, p95_ms}}.
+    """
+    by_format = {}
+    for path, extension, _ in corpus:
+        by_format.setdefault(extension, []).append(path)
+
+    report = {}
+    for extension, paths in sorted(by_format.items()):
+        extractors.extract_text(paths[0], extension)
+
+        timings = []
+        total_bytes = sum(os.path.getsize(path) for path in paths) * repeats
+        started = time.perf_counter()
+        for _ in range(repeats):
+            for path in paths:
+                call_started = time.perf_counter()
+                extractors.extract_text(path, extension)
+                timings.append(time.perf_counter() - call_started)
+        elapsed = time.perf_counter() - started
+
+        report[extension] = {
+            'files': len(timings),
+            'mb': round(total_bytes / 1e6, 3),
+            'seconds': round(elapsed, 3),
+            'files_per_second': round(len(timings) / elapsed, 2),
+            'mb_per_second': round(total_bytes / 1e6 / elapsed, 2),
+            'p50_ms': round(percentile(timings, 50) * 1000, 2),
+            'p95_ms': round(percentile(timings, 95) * 1000, 2),
+        }
+    return report
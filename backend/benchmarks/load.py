@@ -0,0 +1,147 @@
+import os
+import sys
+import json
+import time
+import signal
+import uuid
+import shutil
+import threading
+import subprocess
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.stats import percentile, process_tree_rss
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'txt': 'text/plain',
+}
+
+
+def start_app(port, env, workers=2, threads=8):
+    """Start the backend under gunicorn (or Flask's threaded server if gunicorn is missing)"""
+    if shutil.which('gunicorn'):
+        command = ['gunicorn', '--workers', str(workers), '--threads', str(threads),
+                   '--bind', f'127.0.0.1:{port}', '--log-level', 'warning', 'app:app']
+    else:
+        command = [sys.executable, '-c',
+                   f"from app import app; app.run(host='127.0.0.1', port={port}, threaded=True)"]
+    # In its own session so stop_app can take down the workers and their extraction pools too
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env={**os.environ, **env}, start_new_session=True)
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Backend exited with status {process.returncode} during start-up")
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/health', timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.05)
+    stop_app(process)
+    raise RuntimeError("Backend did not become healthy within 60s")
+
+
+def stop_app(process, timeout=10):
+    """
+    Stop the backend gracefully, killing its whole process group if that stalls.
+
+    A worker forked moments before the SIGTERM can miss it (gunicorn installs the
+    worker's handlers after the fork) and would otherwise hold the shutdown for
+    the full graceful timeout.
+    """
+    process.terminate()
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+
+def multipart_body(path, extension):
+    boundary = uuid.uuid4().hex
+    with open(path, 'rb') as f:
+        data = f.read()
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{os.path.basename(path)}"\r\n'
+            f'Content-Type: {CONTENT_TYPES[extension]}\r\n\r\n').encode('utf-8') + data + f'\r\n--{boundary}--\r\n'.encode('utf-8')
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+class RSSSampler:
+    """Samples the RSS of a process tree in the background and keeps the peak"""
+
+    def __init__(self, pid, interval=0.2):
+        self.pid = pid
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = process_tree_rss(self.pid)
+            if rss is not None:
+                self.peak = max(self.peak or 0, rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def drive_uploads(base_url, corpus, requests=200, concurrency=8, warmup=None, timeout=120):
+    """
+    POST corpus files round-robin to /api/upload from concurrency client threads.
+
+    The first warmup uploads (default: one per client) start the workers'
+    extraction pools and connections and are not measured. Returns latency
+    percentiles, throughput and the error rate.
+    """
+    bodies = [multipart_body(path, extension) for path, extension, _ in corpus]
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def upload(index):
+        body, content_type = bodies[index % len(bodies)]
+        request = urllib.request.Request(f'{base_url}/api/upload', data=body, method='POST',
+                                         headers={'Content-Type': content_type})
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                decision = json.loads(response.read())['result'].get('decision')
+            failed = decision == 'ERROR'
+        except (OSError, ValueError, KeyError) as e:
+            failed, decision = True, str(e)
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            if failed:
+                errors.append(decision)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(upload, range(concurrency if warmup is None else warmup)))
+        latencies.clear()
+        errors.clear()
+
+        started = time.perf_counter()
+        list(executor.map(upload, range(requests)))
+        wall = time.perf_counter() - started
+
+    if errors:
+        print(f"{len(errors)} failed uploads, e.g. {errors[0]}")
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'seconds': round(wall, 3),
+        'rps': round(requests / wall, 2),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        'error_rate': round(len(errors) / requests, 4),
+    }
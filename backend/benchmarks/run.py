@@ -0,0 +1,162 @@
+"""
+End-to-end benchmarks: extraction throughput per format and concurrent /api/upload
+load against a local stub LLM server, compared with a stored baseline.
+
+Run from the backend directory:
+    python -m benchmarks.run                   # full suite, compared with benchmarks/baseline.json
+    python -m benchmarks.run --save-baseline   # record the current numbers as the baseline
+    python -m benchmarks.run --skip-load --skip-startup   # extraction only (no server needed)
+
+Exits with status 1 when a metric is worse than the baseline by more than --tolerance.
+"""
+import os
+import sys
+import json
+import socket
+import argparse
+import platform
+import tempfile
+from datetime import datetime
+from benchmarks import corpus as corpus_module
+from benchmarks.stats import compare
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(BENCHMARKS_DIR, 'results', 'latest.json')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def app_env(work_dir, api_base):
+    return {
+        'LLM_BACKEND': 'openai',
+        'LLM_API_BASE': api_base,
+        'OPENAI_API_KEY': 'sk-benchmark',
+        # Every upload should reach the (stub) provider, and nothing should land in data/
+        'CV_CACHE_MAX_ENTRIES': '0',
+        'CV_CACHE_PERSISTENT': 'false',
+        'KEEP_UPLOADS': 'false',
+        'KEEP_CV_TEXT': 'false',
+        'GUNICORN_PRELOAD': 'false',
+        'RESULTS_DB': os.path.join(work_dir, 'results.db'),
+    }
+
+
+def run_load(corpus, work_dir, args):
+    """Start the stub LLM server and the backend, drive /api/upload and return the load report"""
+    from benchmarks.load import RSSSampler, drive_uploads, start_app, stop_app
+    from benchmarks.stub_server import StubLLMServer
+
+    stub = StubLLMServer(latency_ms=args.latency_ms, jitter=args.jitter, seed=1).start()
+    port = free_port()
+    env = app_env(work_dir, f'{stub.url}/v1')
+    process = start_app(port, env, workers=args.workers, threads=args.threads)
+    try:
+        with RSSSampler(process.pid) as sampler:
+            report = drive_uploads(f'http://127.0.0.1:{port}', corpus, requests=args.requests,
+                                   concurrency=args.concurrency)
+        if sampler.peak is not None:
+            report['peak_rss_mb'] = round(sampler.peak / 1e6, 1)
+        report['llm_calls'] = stub.requests
+    finally:
+        stop_app(process)
+        stub.stop()
+    return report
+
+
+def print_report(report):
+    startup = report.get('startup')
+    if startup:
+        print(f"startup import app {startup['import_app_ms']}ms, healthy after {startup['ready_ms']}ms "
+              f"({startup['ready_preload_ms']}ms with --preload warm-up)")
+    for extension, row in report.get('extraction', {}).items():
+        print(f"extract {extension:<5} {row['files_per_second']:>8.1f} files/s {row['mb_per_second']:>7.2f} MB/s "
+              f"p50 {row['p50_ms']:.1f}ms p95 {row['p95_ms']:.1f}ms")
+    upload = report.get('upload')
+    if upload:
+        rss = f"{upload['peak_rss_mb']} MB" if 'peak_rss_mb' in upload else 'n/a'
+        print(f"upload  {upload['rps']:.2f} req/s p50 {upload['p50_ms']}ms p95 {upload['p95_ms']}ms "
+              f"p99 {upload['p99_ms']}ms errors {upload['error_rate']:.2%} peak RSS {rss}")
+
+
+def print_comparison(rows):
+    print(f"\n{'metric':<40} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, before, after, change, status in rows:
+        print(f"{name:<40} {before:>12} {after:>12} {change:>+8.1%} {status if status != 'ok' else ''}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extraction and /api/upload benchmarks")
+    parser.add_argument('--per-size', type=int, default=5, help="CVs per size and format in the corpus")
+    parser.add_argument('--repeats', type=int, default=3, help="passes over the corpus for extraction")
+    parser.add_argument('--requests', type=int, default=200, help="uploads to send in the load test")
+    parser.add_argument('--concurrency', type=int, default=8, help="concurrent upload clients")
+    parser.add_argument('--workers', type=int, default=2, help="gunicorn workers")
+    parser.add_argument('--threads', type=int, default=8, help="gunicorn threads per worker")
+    parser.add_argument('--latency-ms', type=float, default=800, help="median stub LLM latency")
+    parser.add_argument('--jitter', type=float, default=0.3, help="log-normal sigma of the stub latency")
+    parser.add_argument('--skip-extraction', action='store_true')
+    parser.add_argument('--skip-load', action='store_true')
+    parser.add_argument('--skip-startup', action='store_true')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="write this run to --baseline")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="allowed relative slowdown (0.10 = 10%%)")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count()},
+        'config': {key: value for key, value in vars(args).items()
+                   if key not in ('baseline', 'save_baseline', 'output')},
+    }
+
+    with tempfile.TemporaryDirectory(prefix='cv-bench-') as work_dir:
+        corpus = corpus_module.generate(os.path.join(work_dir, 'corpus'), per_size=args.per_size)
+        print(f"Generated {len(corpus)} CVs in {work_dir}")
+
+        if not args.skip_extraction:
+            from benchmarks.extraction import bench_extraction
+            report['extraction'] = bench_extraction(corpus, repeats=args.repeats)
+        if not args.skip_startup:
+            from benchmarks.startup import bench_startup
+            report['startup'] = bench_startup(free_port, app_env(work_dir, 'http://127.0.0.1:9/v1'),
+                                              workers=args.workers, threads=args.threads)
+        if not args.skip_load:
+            report['upload'] = run_load(corpus, work_dir, args)
+
+    print_report(report)
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    measured = ('extraction', 'startup', 'upload')
+    rows, regressions = compare({k: report[k] for k in measured if k in report},
+                                {k: baseline[k] for k in measured if k in baseline}, args.tolerance)
+    print_comparison(rows)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"\nNo regressions beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
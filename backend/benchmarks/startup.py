@@ -0,0 +1,33 @@
+import os
+import sys
+import time
+import subprocess
+from benchmarks.load import BACKEND_DIR, start_app, stop_app
+
+IMPORT_SCRIPT = "import time; started = time.perf_counter(); import {module}; print(time.perf_counter() - started)"
+
+
+def import_time(module, env=None):
+    """Seconds to import module in a fresh interpreter"""
+    output = subprocess.run(
+        [sys.executable, '-c', IMPORT_SCRIPT.format(module=module)],
+        cwd=BACKEND_DIR, env={**os.environ, **(env or {})}, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def bench_startup(free_port, env, workers=2, threads=8, runs=3):
+    """
+    Cold-start costs: importing the app, and time from launching gunicorn to the
+    first healthy /api/health, with and without --preload warm-up (best of runs).
+    """
+    report = {'import_app_ms': round(min(import_time('app', env) for _ in range(runs)) * 1000, 1)}
+    for label, preload in (('ready_ms', 'false'), ('ready_preload_ms', 'true')):
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            process = start_app(free_port(), {**env, 'GUNICORN_PRELOAD': preload}, workers=workers, threads=threads)
+            timings.append(time.perf_counter() - started)
+            stop_app(process)
+        report[label] = round(min(timings) * 1000, 1)
+    return report
@@ -0,0 +1,78 @@
+import os
+import math
+
+# Metric name suffixes where a larger value is an improvement; everything else is lower-is-better
+HIGHER_IS_BETTER = ('per_second', 'rps')
+# Report fields that describe the run rather than measure it
+INFORMATIONAL = {'files', 'mb', 'seconds', 'requests', 'concurrency', 'llm_calls'}
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of values (0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def process_tree_rss(pid):
+    """Resident set size in bytes of pid and all its descendants, or None without /proc"""
+    total, stack, seen = 0, [pid], set()
+    while stack:
+        current = stack.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        try:
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+                        break
+            for task in os.listdir(f'/proc/{current}/task'):
+                with open(f'/proc/{current}/task/{task}/children') as f:
+                    stack.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            if current == pid:
+                return None
+    return total
+
+
+def flatten(report, prefix=''):
+    """Flatten nested report dicts into {'a.b.c': number}"""
+    flat = {}
+    for key, value in report.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(current, baseline, tolerance=0.10):
+    """
+    Compare two reports metric by metric.
+
+    Returns (rows, regressions): one row per metric present in both, as
+    (name, baseline value, current value, relative change, status), and the
+    names of metrics that got worse by more than tolerance.
+    """
+    current, baseline = flatten(current), flatten(baseline)
+    rows, regressions = [], []
+    for name in sorted(set(current) & set(baseline)):
+        before, after = baseline[name], current[name]
+        if name.rsplit('.', 1)[-1] in INFORMATIONAL or before == after == 0:
+            continue
+        # From a zero baseline (such as the error rate) any increase counts as a full 100% change
+        change = (after - before) / abs(before) if before else 1.0
+        worse = -change if name.endswith(HIGHER_IS_BETTER) else change
+        status = 'ok'
+        if worse > tolerance:
+            status = 'REGRESSION'
+            regressions.append(name)
+        elif worse < -tolerance:
+            status = 'improved'
+        rows.append((name, before, after, change, status))
+    return rows, regressions
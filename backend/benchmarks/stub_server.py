@@ -0,0 +1,133 @@
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from llm import StubBackend
+
+# Characters per streamed chunk, roughly a few tokens
+STREAM_CHUNK_CHARS = 16
+
+
+class StubLLMServer:
+    """
+    OpenAI-compatible chat completions server answering with StubBackend output.
+
+    Each completion takes a log-normally distributed time with the given median
+    and spread, like a real provider, so load tests exercise the HTTP client,
+    connection pool and worker concurrency without spending tokens. Point the
+    OpenAI backend at it with LLM_API_BASE=<url>/v1.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=800, jitter=0.3, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stub = StubBackend(latency_ms=0)
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def sample_latency(self):
+        with self._lock:
+            self.requests += 1
+            if self.jitter <= 0:
+                return self.latency_ms / 1000.0
+            return self._rng.lognormvariate(math.log(max(self.latency_ms, 1)), self.jitter) / 1000.0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='stub-llm', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                if not self.path.endswith('/chat/completions'):
+                    self.send_error(404)
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                prompt = (body.get('messages') or [{}])[-1].get('content', '')
+                content = json.dumps(server._stub.build_response(prompt), indent=2)
+                latency = server.sample_latency()
+                if body.get('stream'):
+                    self.stream(body, content, latency)
+                else:
+                    time.sleep(latency)
+                    self.reply(body, prompt, content)
+
+            def reply(self, body, prompt, content):
+                payload = json.dumps({
+                    'id': 'chatcmpl-stub',
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': body.get('model', 'stub'),
+                    'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content},
+                                 'finish_reason': 'stop'}],
+                    'usage': {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(content) // 4,
+                              'total_tokens': (len(prompt) + len(content)) // 4},
+                }).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def stream(self, body, content, latency):
+                chunks = [content[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)]
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                for index, chunk in enumerate(chunks):
+                    time.sleep(latency / len(chunks))
+                    event = {
+                        'id': 'chatcmpl-stub',
+                        'object': 'chat.completion.chunk',
+                        'created': int(time.time()),
+                        'model': body.get('model', 'stub'),
+                        'choices': [{'index': 0, 'delta': {'content': chunk} if index else
+                                     {'role': 'assistant', 'content': chunk}, 'finish_reason': None}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode('utf-8'))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+        return Handler
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub LLM server for load tests")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency-ms', type=float, default=800, help="median completion latency")
+    parser.add_argument('--jitter', type=float, default=0.3, help="log-normal sigma of the latency")
+    args = parser.parse_args()
+
+    stub = StubLLMServer(args.host, args.port, args.latency_ms, args.jitter)
+    print(f"Stub LLM server on {stub.url} (set LLM_API_BASE={stub.url}/v1)")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
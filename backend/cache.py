@@ -0,0 +1,225 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_FOLDER = os.path.join(BASE_DIR, 'data', 'cache')
+
+
+def normalize_text(text):
+    """Collapse whitespace so trivially different extractions hash the same"""
+    return re.sub(r'\s+', ' ', text or '').strip()
+
+
+def make_cache_key(cv_text, criteria_text, model_name, prompt_version):
+    """Build a content-addressed key for an analysis request"""
+    digest = hashlib.sha256()
+    for part in (normalize_text(cv_text), normalize_text(criteria_text), model_name, str(prompt_version)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """
+    Two-tier cache for analysis results.
+
+    The memory tier is a per-process LRU; the disk tier keeps one JSON file per
+    key under data/cache so results survive restarts and are shared between
+    gunicorn workers. Both tiers honour the same TTL.
+    """
+
+    def __init__(self, max_entries=256, max_disk_entries=5000, ttl_seconds=7 * 24 * 3600,
+                 folder=CACHE_FOLDER, persistent=True):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self.folder = folder
+        self.persistent = persistent
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.persistent:
+            os.makedirs(self.folder, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        """Create a cache configured from CV_CACHE_* environment variables"""
+        return cls(
+            max_entries=int(os.environ.get('CV_CACHE_MAX_ENTRIES', 256)),
+            max_disk_entries=int(os.environ.get('CV_CACHE_MAX_DISK_ENTRIES', 5000)),
+            ttl_seconds=int(os.environ.get('CV_CACHE_TTL_SECONDS', 7 * 24 * 3600)),
+            persistent=os.environ.get('CV_CACHE_PERSISTENT', 'true').lower() == 'true',
+        )
+
+    def _expired(self, created):
+        return self.ttl_seconds > 0 and time.time() - created > self.ttl_seconds
+
+    def _path(self, key):
+        return os.path.join(self.folder, f"{key}.json")
+
+    def get(self, key):
+        """Return a copy of the cached result for key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created, payload = entry
+                if self._expired(created):
+                    del self._entries[key]
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return json.loads(payload)
+
+        if self.persistent:
+            entry = self._read_disk(key)
+            if entry is not None:
+                created, payload = entry
+                with self._lock:
+                    self._remember(key, created, payload)
+                    self.hits += 1
+                    self.disk_hits += 1
+                return json.loads(payload)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, result):
+        """Store result under key in both tiers"""
+        created = time.time()
+        payload = json.dumps(result)
+        with self._lock:
+            self._remember(key, created, payload)
+
+        if self.persistent:
+            self._write_disk(key, created, payload)
+
+    def _remember(self, key, created, payload):
+        self._entries[key] = (created, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _read_disk(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading cache entry {key}: {e}")
+            return None
+
+        created = data.get('created', 0)
+        if self._expired(created):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return created, json.dumps(data.get('result'))
+
+    def _write_disk(self, key, created, payload):
+        # Write to a temp file and rename so readers never see a partial entry
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                f.write(f'{{"created": {created}, "result": {payload}}}')
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error writing cache entry {key}: {e}")
+            return
+
+        self._writes_since_prune += 1
+        if self._writes_since_prune >= 50:
+            self._writes_since_prune = 0
+            self.prune_disk()
+
+    def prune_disk(self):
+        """Drop expired disk entries and the oldest ones beyond max_disk_entries"""
+        try:
+            names = [name for name in os.listdir(self.folder) if name.endswith('.json')]
+        except FileNotFoundError:
+            return
+
+        entries = []
+        for name in names:
+            path = os.path.join(self.folder, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+
+        entries.sort()
+        cutoff = time.time() - self.ttl_seconds if self.ttl_seconds > 0 else None
+        excess = len(entries) - self.max_disk_entries
+        for index, (mtime, path) in enumerate(entries):
+            if index < excess or (cutoff is not None and mtime < cutoff):
+                try:
+                    os.remove(path)
+                    self.evictions += 1
+                except OSError:
+                    pass
+
+    def stats(self):
+        """Return hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class InflightRequests:
+    """
+    Coalesces identical concurrent computations within this process.
+
+    The first caller for a key runs the computation; callers arriving while it
+    is still running wait for the same outcome instead of starting another.
+    """
+
+    def __init__(self):
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def run(self, key, fn, *args):
+        """Return (fn(*args), True if the outcome was shared from another caller's run)"""
+        with self._lock:
+            future = self._futures.get(key)
+            leader = future is None
+            if leader:
+                future = self._futures[key] = Future()
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._futures.pop(key, None)
+        return future.result(), False
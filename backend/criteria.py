@@ -0,0 +1,114 @@
+import os
+import json
+import hashlib
+import threading
+import rules
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CRITERIA_FILE = os.path.join(BASE_DIR, 'data', 'criteria.json')
+
+# Default QA Engineer criteria, written to CRITERIA_FILE when it does not exist
+DEFAULT_CRITERIA = """QUALITY FOCUSED: Shift left mentality, risk mitigation, testability across SDLC, test methodology knowledge
+TESTING KNOWLEDGE: Wide range of testing skills, non-functional testing concerns, requirements definition
+COLLABORATIVE: Team-focused, sees testing as team activity, knowledge sharing, mediation
+TEST ARCHITECTURE: Tool selection, architecture discussions, CI/CD appreciation, pipeline design
+DEVELOPMENT SKILLS: Multiple languages, clean code, production/test code contributions, debugging
+ADAPTABLE: Pragmatic, self-organizing, not a quality gateway, independent work
+CLIENT FOCUSED: Empathy, value delivery, holistic awareness, diplomacy
+ANALYTICAL: Inquisitive, detail-oriented, well-organized, continuous learning
+COMMUNITY: Knowledge sharing, seeking advice, coaching/mentoring"""
+
+# Ad-hoc criteria versions (criteria sent with a request) kept in memory
+MAX_ADHOC_VERSIONS = 32
+
+
+def criteria_hash(criteria_text):
+    """Short, stable version identifier for a criteria text"""
+    return hashlib.sha256(criteria_text.strip().encode('utf-8')).hexdigest()[:12]
+
+
+class CriteriaVersion:
+    """One immutable criteria text with its version hash and memoized prompt prefixes"""
+
+    def __init__(self, text, data=None):
+        self.text = text
+        self.data = data if data is not None else {'criteria': text}
+        self.version = criteria_hash(text)
+        self.descriptions = rules.category_descriptions(text)
+        self._prefixes = {}
+        self._lock = threading.Lock()
+
+    def prefix(self, name, render):
+        """Return the prompt prefix called name, rendering it with render(self) the first time"""
+        prefix = self._prefixes.get(name)
+        if prefix is None:
+            with self._lock:
+                prefix = self._prefixes.get(name)
+                if prefix is None:
+                    prefix = render(self)
+                    self._prefixes[name] = prefix
+        return prefix
+
+
+class CriteriaRegistry:
+    """
+    Criteria loaded once from data/criteria.json and reloaded when its mtime changes.
+
+    Criteria sent with a request rather than read from the file get their own
+    version, memoized by hash, so their prompts are rendered only once too.
+    """
+
+    def __init__(self, path=CRITERIA_FILE):
+        self.path = path
+        self._current = None
+        self._mtime = None
+        self._adhoc = {}
+        self._lock = threading.Lock()
+
+    def ensure_file(self):
+        """Create the criteria file with DEFAULT_CRITERIA if it does not exist"""
+        if not os.path.exists(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'w') as f:
+                json.dump({'criteria': DEFAULT_CRITERIA}, f)
+
+    def current(self):
+        """Return the CriteriaVersion for the criteria file, reloading it if it changed"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            self.ensure_file()
+            mtime = os.stat(self.path).st_mtime_ns
+
+        if self._current is not None and mtime == self._mtime:
+            return self._current
+
+        with self._lock:
+            if self._current is None or mtime != self._mtime:
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+                self._current = CriteriaVersion(data.get('criteria') or DEFAULT_CRITERIA, data)
+                self._mtime = mtime
+            return self._current
+
+    def resolve(self, criteria_text=None):
+        """Return the CriteriaVersion for criteria_text, or the file's criteria when it is empty"""
+        if not criteria_text or not criteria_text.strip():
+            return self.current()
+
+        current = self.current()
+        key = criteria_hash(criteria_text)
+        if key == current.version:
+            return current
+
+        with self._lock:
+            version = self._adhoc.get(key)
+            if version is None:
+                if len(self._adhoc) >= MAX_ADHOC_VERSIONS:
+                    self._adhoc.pop(next(iter(self._adhoc)))
+                version = CriteriaVersion(criteria_text)
+                self._adhoc[key] = version
+            return version
+
+
+registry = CriteriaRegistry()
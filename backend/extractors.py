@@ -1,35 +1,224 @@
+import io
 import os
-import docx2txt
-from pdfminer.high_level import extract_text as pdf_extract_text
+import atexit
+import signal
+import threading
+import faulthandler
+import multiprocessing
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import metrics
+
+# Extraction runs in a pool of worker processes so pdfminer's CPU-bound parsing
+# neither holds the web worker's GIL nor ties it up on pathological files
+EXTRACT_USE_POOL = os.environ.get('EXTRACT_USE_POOL', 'true').lower() == 'true'
+EXTRACT_WORKERS = int(os.environ.get('EXTRACT_WORKERS', os.cpu_count() or 2))
+EXTRACT_TIMEOUT_SECONDS = float(os.environ.get('EXTRACT_TIMEOUT_SECONDS', 20))
+EXTRACT_MAX_PAGES = int(os.environ.get('EXTRACT_MAX_PAGES', 30))
+EXTRACT_MAX_CHARS = int(os.environ.get('EXTRACT_MAX_CHARS', 100000))
+EXTRACT_MEMORY_LIMIT_MB = int(os.environ.get('EXTRACT_MEMORY_LIMIT_MB', 512))
+# Seconds past EXTRACT_TIMEOUT_SECONDS before a worker stuck in native code exits
+EXTRACT_KILL_GRACE_SECONDS = 5
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class ExtractionError(Exception):
+    """Raised when a document cannot be extracted within the configured limits"""
+
+
+class ExtractionTimeout(ExtractionError):
+    """Raised when extracting a document takes longer than EXTRACT_TIMEOUT_SECONDS"""
+
+
+def _memory_limit_error():
+    return ExtractionError(f"Document exceeds the {EXTRACT_MEMORY_LIMIT_MB}MB extraction memory limit")
+
+
+class _Deadline(BaseException):
+    # A BaseException so the extractors' `except Exception` fallbacks cannot swallow it
+    pass
+
 
 def extract_text(file_path, extension):
     """Extract text from various file formats"""
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
-    
+
+    if extension not in ('pdf', 'docx', 'txt'):
+        raise ValueError(f"Unsupported file extension: {extension}")
+
+    with metrics.timer('extract'):
+        if not EXTRACT_USE_POOL:
+            return _extract_local(file_path, extension)
+
+        return _run_in_pool(_extract_local, file_path, extension)
+
+def extract_text_from_bytes(data, extension):
+    """Extract text from an in-memory upload without touching the disk"""
+    if extension not in ('pdf', 'docx', 'txt'):
+        raise ValueError(f"Unsupported file extension: {extension}")
+
+    with metrics.timer('extract'):
+        # Decoding plain text is cheap, so skip the round trip to the pool
+        if extension == 'txt':
+            return decode_text(data)[:EXTRACT_MAX_CHARS]
+
+        if not EXTRACT_USE_POOL:
+            return _extract_local(data, extension)
+
+        return _run_in_pool(_extract_local, data, extension)
+
+def _extract_local(source, extension):
+    """Extract text from a path or raw bytes in the current process, capped at EXTRACT_MAX_CHARS"""
+    if isinstance(source, bytes):
+        # pdfminer and docx2txt both accept file-like objects
+        source = io.BytesIO(source)
+
     if extension == 'pdf':
-        return extract_text_from_pdf(file_path)
+        text = extract_text_from_pdf(source)
     elif extension == 'docx':
-        return extract_text_from_docx(file_path)
-    elif extension == 'txt':
-        return extract_text_from_txt(file_path)
+        text = extract_text_from_docx(source)
     else:
-        raise ValueError(f"Unsupported file extension: {extension}")
+        text = extract_text_from_txt(source)
+    return text[:EXTRACT_MAX_CHARS]
+
+def _run_in_pool(fn, *args):
+    pool = _get_pool()
+    try:
+        # The deadline is enforced inside the worker, so time spent queued behind
+        # other documents does not count against it
+        return pool.submit(_run_with_deadline, fn, EXTRACT_TIMEOUT_SECONDS, *args).result()
+    except (ExtractionTimeout, _Deadline):
+        metrics.errors.inc('extraction_timeout')
+        raise ExtractionTimeout(f"Text extraction timed out after {EXTRACT_TIMEOUT_SECONDS:g}s") from None
+    except ExtractionError:
+        metrics.errors.inc('extraction_memory')
+        raise
+    except BrokenProcessPool:
+        _reset_pool(pool)
+        metrics.errors.inc('extraction_crash')
+        raise ExtractionError("Text extraction worker crashed (the document may exceed the memory limit)")
+    except CancelledError:
+        # Queued when another request found the pool broken and recycled it
+        metrics.errors.inc('extraction_crash')
+        raise ExtractionError("Text extraction was interrupted by a crashed worker, please retry")
+
+def _run_with_deadline(fn, timeout, *args):
+    """
+    Run fn in an extraction worker, timing out timeout seconds after the task starts.
+
+    SIGALRM interrupts the document and leaves the worker ready for the next one.
+    If the worker is stuck in native code and never handles the signal,
+    faulthandler's watchdog thread exits this worker alone after a grace period.
+    """
+    if not timeout or not hasattr(signal, 'setitimer'):
+        return fn(*args)
+    try:
+        faulthandler.dump_traceback_later(timeout + EXTRACT_KILL_GRACE_SECONDS, exit=True)
+    except RuntimeError:
+        # The watchdog thread cannot start when the worker is already at its memory limit
+        raise _memory_limit_error() from None
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return fn(*args)
+    except _Deadline:
+        raise ExtractionTimeout(f"Text extraction timed out after {timeout:g}s") from None
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        faulthandler.cancel_dump_traceback_later()
+
+def _raise_deadline(signum, frame):
+    raise _Deadline()
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Created lazily so each gunicorn worker builds its own pool after forking;
+            # spawn avoids forking a process that already runs request threads
+            _pool = ProcessPoolExecutor(
+                max_workers=EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(EXTRACT_MEMORY_LIMIT_MB,)
+            )
+        return _pool
+
+def _reset_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def prestart_pool():
+    """Start the extraction pool's processes in the background, ahead of the first upload"""
+    if not EXTRACT_USE_POOL:
+        return
+    pool = _get_pool()
+    for _ in range(EXTRACT_WORKERS):
+        pool.submit(len, '')
+
+def _init_worker(memory_limit_mb):
+    """Load the extraction libraries and cap the address space of extraction workers so huge documents fail fast"""
+    # Pool processes are spawned, not forked, so they never inherit the parent's imports
+    import docx2txt  # noqa: F401
+    import pdfminer.high_level  # noqa: F401
+    import pdfminer.layout  # noqa: F401
+
+    if hasattr(signal, 'SIGALRM'):
+        signal.signal(signal.SIGALRM, _raise_deadline)
+
+    if not memory_limit_mb:
+        return
+    try:
+        import resource
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        print(f"Could not set extraction worker memory limit: {e}")
+
+@atexit.register
+def shutdown_pool():
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
 
 def extract_text_from_pdf(file_path):
-    """Extract text from PDF files"""
+    """Extract text from a PDF path or file object, stopping at EXTRACT_MAX_PAGES or EXTRACT_MAX_CHARS"""
+    # pdfminer is imported on first use so importing this module (and starting the app) stays fast
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+
     try:
-        text = pdf_extract_text(file_path)
-        return text
+        pages = []
+        length = 0
+        for page_layout in extract_pages(file_path, maxpages=EXTRACT_MAX_PAGES):
+            page_text = ''.join(
+                element.get_text() for element in page_layout if isinstance(element, LTTextContainer)
+            )
+            # Form feed between pages, as pdfminer's extract_text does
+            pages.append(page_text + '\f')
+            length += len(page_text) + 1
+            if length >= EXTRACT_MAX_CHARS:
+                break
+        return ''.join(pages)
+    except MemoryError:
+        raise _memory_limit_error() from None
     except Exception as e:
         print(f"Error extracting text from PDF: {e}")
         return ""
 
 def extract_text_from_docx(file_path):
-    """Extract text from DOCX files"""
+    """Extract text from a DOCX path or file object"""
+    import docx2txt
+
     try:
         text = docx2txt.process(file_path)
         return text
+    except MemoryError:
+        raise _memory_limit_error() from None
     except Exception as e:
         print(f"Error extracting text from DOCX: {e}")
         return ""
@@ -38,15 +227,22 @@ def extract_text_from_txt(file_path):
     """Extract text from TXT files"""
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
+            return f.read(EXTRACT_MAX_CHARS)
     except UnicodeDecodeError:
         # Try with different encoding if UTF-8 fails
         try:
             with open(file_path, 'r', encoding='latin-1') as f:
-                return f.read()
+                return f.read(EXTRACT_MAX_CHARS)
         except Exception as e:
             print(f"Error extracting text from TXT: {e}")
             return ""
     except Exception as e:
         print(f"Error extracting text from TXT: {e}")
         return ""
+
+def decode_text(data):
+    """Decode raw TXT upload bytes, falling back to latin-1 if UTF-8 fails"""
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data.decode('latin-1')
@@ -0,0 +1,33 @@
+import os
+import time
+
+# Gunicorn reads this file automatically when started from the backend directory.
+# With GUNICORN_PRELOAD=true the app is imported once in the master and warmup.py loads
+# the extraction and LLM stacks there too, so every forked worker starts with them in
+# memory (shared copy-on-write) instead of importing them on its first request.
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'false').lower() == 'true'
+
+_started = time.perf_counter()
+
+
+def when_ready(server):
+    # Also covers `gunicorn --preload`, which overrides the setting above
+    if server.cfg.preload_app:
+        import warmup
+        steps = warmup.warm_up()
+        server.log.info("Warm-up finished in %.0fms (%s)", sum(steps.values()),
+                        ', '.join(f"{name} {ms:.0f}ms" for name, ms in steps.items()))
+    server.log.info("Master ready %.0fms after start (preload=%s)",
+                    (time.perf_counter() - _started) * 1000, server.cfg.preload_app)
+
+
+def post_fork(server, worker):
+    server.log.info("Worker %s forked %.0fms after start", worker.pid, (time.perf_counter() - _started) * 1000)
+
+
+def post_worker_init(worker):
+    # The extraction pool is per worker and must be created after the fork; with preload,
+    # start its processes now (without waiting) so the first PDF does not pay for them
+    if worker.cfg.preload_app:
+        import extractors
+        extractors.prestart_pool()
@@ -0,0 +1,140 @@
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from uploads import PRUNE_INTERVAL_SECONDS, prune_folder
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JOBS_FOLDER = os.path.join(BASE_DIR, 'data', 'jobs')
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+ERROR = 'error'
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue already holds its maximum number of pending jobs"""
+
+
+class JobQueue:
+    """
+    Bounded in-process job queue backed by a thread pool.
+
+    Job states are mirrored to data/jobs/<id>.json so a status poll that lands
+    on a different gunicorn worker than the one running the job still sees it.
+    Finished jobs drop their status file, as the stored result takes over.
+    Status files of failed jobs (and of jobs orphaned by a worker that died)
+    are deleted once they are retention_days old.
+    """
+
+    def __init__(self, max_workers=4, max_pending=100, folder=JOBS_FOLDER, retention_days=1):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.folder = folder
+        self.retention_days = retention_days
+        self._last_prune = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='cv-job')
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self.completed = 0
+        self.failed = 0
+
+        os.makedirs(self.folder, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        """Create a queue configured from JOB_* environment variables"""
+        return cls(
+            max_workers=int(os.environ.get('JOB_WORKERS', 4)),
+            max_pending=int(os.environ.get('JOB_MAX_PENDING', 100)),
+            retention_days=float(os.environ.get('JOB_RETENTION_DAYS', 1)),
+        )
+
+    def submit(self, job_id, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) under job_id"""
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if job['status'] in (QUEUED, RUNNING))
+            if pending >= self.max_pending:
+                raise QueueFullError(f"Job queue is full ({pending} pending jobs)")
+            self._set_status(job_id, QUEUED)
+
+        self._executor.submit(self._run, job_id, fn, args, kwargs)
+        self.maybe_prune()
+
+    def maybe_prune(self):
+        """Delete expired status files if the last sweep was long enough ago"""
+        with self._lock:
+            now = time.time()
+            if now - self._last_prune < PRUNE_INTERVAL_SECONDS:
+                return
+            self._last_prune = now
+        return prune_folder(self.folder, retention_days=self.retention_days, max_files=0)
+
+    def _run(self, job_id, fn, args, kwargs):
+        with self._lock:
+            self._set_status(job_id, RUNNING)
+
+        try:
+            fn(*args, **kwargs)
+        except Exception as e:
+            print(f"Error running job {job_id}: {e}")
+            with self._lock:
+                self.failed += 1
+                self._set_status(job_id, ERROR, error=str(e))
+                # The status file keeps the error around for pollers
+                self._jobs.pop(job_id, None)
+            return
+
+        with self._lock:
+            self.completed += 1
+            self._jobs.pop(job_id, None)
+            try:
+                os.remove(self._path(job_id))
+            except OSError:
+                pass
+
+    def _path(self, job_id):
+        return os.path.join(self.folder, f"{job_id}.json")
+
+    def _set_status(self, job_id, status, error=None):
+        job = self._jobs.setdefault(job_id, {'id': job_id, 'created': datetime.now().isoformat()})
+        job['status'] = status
+        job['updated'] = datetime.now().isoformat()
+        if error is not None:
+            job['error'] = error
+
+        tmp_path = f"{self._path(job_id)}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(job, f)
+            os.replace(tmp_path, self._path(job_id))
+        except Exception as e:
+            print(f"Error persisting status for job {job_id}: {e}")
+
+    def status(self, job_id):
+        """Return the status record for job_id, or None if it is unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return dict(job)
+
+        try:
+            with open(self._path(job_id), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def stats(self):
+        """Return queue depth and completion counters for monitoring"""
+        with self._lock:
+            states = [job['status'] for job in self._jobs.values()]
+            return {
+                'workers': self.max_workers,
+                'queued': states.count(QUEUED),
+                'running': states.count(RUNNING),
+                'completed': self.completed,
+                'failed': self.failed,
+            }
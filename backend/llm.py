@@ -0,0 +1,335 @@
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+import metrics
+import rules
+
+# LLM settings; the backend is created once per process on first use
+LLM_BACKEND = os.environ.get('LLM_BACKEND', 'openai').lower()
+LLM_MODEL = os.environ.get('LLM_MODEL', 'gpt-3.5-turbo')
+LLM_TEMPERATURE = float(os.environ.get('LLM_TEMPERATURE', 0.3))
+LLM_TIMEOUT_SECONDS = float(os.environ.get('LLM_TIMEOUT_SECONDS', 60))
+LLM_STUB_LATENCY_MS = float(os.environ.get('LLM_STUB_LATENCY_MS', 0))
+# OpenAI-compatible endpoint to use instead of api.openai.com (e.g. the benchmark stub server)
+LLM_API_BASE = os.environ.get('LLM_API_BASE', '')
+
+# Provider limits shared by every call in this process (0 disables a limit); with several
+# gunicorn workers, divide the account's limits between them
+LLM_RPM = int(os.environ.get('LLM_RPM', 0))
+LLM_TPM = int(os.environ.get('LLM_TPM', 0))
+# Completion tokens reserved per call against LLM_TPM, on top of the prompt
+LLM_COMPLETION_TOKENS = int(os.environ.get('LLM_COMPLETION_TOKENS', 1000))
+# Retries for transient provider errors, with full-jitter exponential backoff
+LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', 3))
+LLM_BACKOFF_SECONDS = float(os.environ.get('LLM_BACKOFF_SECONDS', 1))
+LLM_BACKOFF_MAX_SECONDS = float(os.environ.get('LLM_BACKOFF_MAX_SECONDS', 30))
+
+# Exception class names (openai, requests and builtins) worth retrying
+TRANSIENT_ERRORS = {
+    'RateLimitError', 'APIConnectionError', 'ServiceUnavailableError', 'TryAgain', 'Timeout',
+    'APITimeoutError', 'InternalServerError', 'ConnectionError', 'ConnectTimeout', 'ReadTimeout',
+    'TimeoutError',
+}
+TRANSIENT_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+STUB_RATINGS = [rules.STRONG, rules.MODERATE, rules.WEAK, rules.NO_EVIDENCE]
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+class LLMBackend:
+    """Interface for the model that turns a rendered prompt into a completion"""
+
+    model_name = None
+
+    def complete(self, prompt):
+        """Return the completion text for prompt"""
+        raise NotImplementedError
+
+    def stream(self, prompt):
+        """Yield the completion text for prompt in chunks as it is generated"""
+        yield self.complete(prompt)
+
+
+class OpenAIBackend(LLMBackend):
+    """
+    OpenAI chat model via LangChain.
+
+    Connections are reused through the openai client's own keep-alive session,
+    which it keeps per thread and renews every few minutes.
+    """
+
+    def __init__(self, model_name=LLM_MODEL, temperature=LLM_TEMPERATURE,
+                 timeout=LLM_TIMEOUT_SECONDS, api_base=LLM_API_BASE):
+        self.model_name = model_name
+        self.temperature = temperature
+        self.timeout = timeout
+        self.api_base = api_base
+        self._llm = None
+        self._lock = threading.Lock()
+
+    def _client(self):
+        # Built on first use: ChatOpenAI refuses to construct without an API key,
+        # and a missing key should surface per request rather than at startup
+        with self._lock:
+            if self._llm is None:
+                from langchain_community.chat_models import ChatOpenAI
+
+                # Retries are handled by complete() and stream() in this module, so LangChain's own are disabled
+                options = {'openai_api_base': self.api_base} if self.api_base else {}
+                self._llm = ChatOpenAI(
+                    temperature=self.temperature,
+                    model_name=self.model_name,
+                    request_timeout=self.timeout,
+                    max_retries=0,
+                    **options
+                )
+            return self._llm
+
+    def _check_api_key(self):
+        # Check if OpenAI API key is properly set
+        if not os.environ.get("OPENAI_API_KEY") or os.environ.get("OPENAI_API_KEY").startswith("sk-your-"):
+            raise ValueError("OpenAI API key is not properly configured. Please add a valid API key to the .env file.")
+
+    def complete(self, prompt):
+        self._check_api_key()
+        return self._client().invoke(prompt).content
+
+    def stream(self, prompt):
+        self._check_api_key()
+        for chunk in self._client().stream(prompt):
+            if chunk.content:
+                yield chunk.content
+
+
+class StubBackend(LLMBackend):
+    """
+    Deterministic offline backend for load tests and benchmarks.
+
+    The same prompt always yields the same well-formed analysis, after an
+    optional simulated latency, without calling any provider.
+    """
+
+    model_name = 'stub'
+
+    def __init__(self, latency_ms=LLM_STUB_LATENCY_MS):
+        self.latency_ms = latency_ms
+
+    def complete(self, prompt):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        return json.dumps(self.build_response(prompt))
+
+    def stream(self, prompt, chunk_size=16):
+        # Spread the simulated latency evenly over the chunks, like tokens arriving
+        text = json.dumps(self.build_response(prompt), indent=2)
+        chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+        for chunk in chunks:
+            if self.latency_ms:
+                time.sleep(self.latency_ms / 1000.0 / len(chunks))
+            yield chunk
+
+    def build_response(self, prompt):
+        # Seed from the CV portion of the prompt so the same CV always rates the same
+        cv_text = prompt.rsplit("Below is the text extracted from a candidate's CV:", 1)[-1]
+        seed = hashlib.sha256(cv_text.encode('utf-8')).hexdigest()
+        assessments = {}
+        for category in rules.CATEGORIES:
+            rating = random.Random(f"{seed}:{category}").choices(STUB_RATINGS, weights=[5, 3, 1, 1])[0]
+            assessments[category] = {
+                "rating": rating,
+                "assessment": f"Stub assessment for {category.replace('_', ' ').lower()}: {rating.lower()}."
+            }
+
+        match = re.search(r'CATEGORY UNDER REVIEW: (\w+)', prompt)
+        if match and match.group(1) in assessments:
+            return assessments[match.group(1)]
+
+        evaluation = rules.evaluate(assessments)
+        return {
+            "decision": evaluation["decision"],
+            "confidence": evaluation["confidence"],
+            "justification": [f"Stub analysis with {evaluation['strong_count']} categories showing strong evidence"],
+            "strengths": [f"Strong evidence for {category}" for category, rating in evaluation["ratings"].items()
+                          if rating == rules.STRONG][:3],
+            "improvement_areas": [f"Limited evidence for {category}" for category, rating in evaluation["ratings"].items()
+                                  if rating != rules.STRONG][:3],
+            "category_assessments": assessments
+        }
+
+
+class TokenBucket:
+    """Refills continuously at per_minute / 60 per second, holding at most per_minute"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.available = float(per_minute)
+        self.updated = time.monotonic()
+
+    def wait_time(self, amount):
+        """Seconds until amount is available (0 if it is now); call with the limiter's lock held"""
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.capacity / 60.0)
+        self.updated = now
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) * 60.0 / self.capacity
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute token buckets shared by all threads"""
+
+    def __init__(self, rpm=LLM_RPM, tpm=LLM_TPM):
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=0):
+        """Block until one request and tokens are available, then take them. Returns the time waited"""
+        if self.requests is None and self.tokens is None:
+            return 0.0
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                wait = max(
+                    self.requests.wait_time(1) if self.requests else 0.0,
+                    self.tokens.wait_time(tokens) if self.tokens else 0.0,
+                )
+                if wait == 0:
+                    if self.requests:
+                        self.requests.available -= 1
+                    if self.tokens:
+                        self.tokens.available -= min(tokens, self.tokens.capacity)
+                    return time.monotonic() - started
+            time.sleep(min(wait, 1.0))
+
+
+limiter = RateLimiter()
+
+
+def estimate_tokens(prompt):
+    """Tokens a call is expected to use: the prompt (at ~4 characters per token) plus the reserved completion"""
+    return len(prompt) // 4 + LLM_COMPLETION_TOKENS
+
+
+def is_transient(error):
+    """True for rate limits, timeouts, connection failures and 5xx responses"""
+    if type(error).__name__ in TRANSIENT_ERRORS:
+        return True
+    status = getattr(error, 'http_status', None) or getattr(error, 'status_code', None)
+    return status in TRANSIENT_STATUS
+
+
+def backoff_delay(attempt, error=None):
+    """Full-jitter exponential backoff, never shorter than a Retry-After the provider sent"""
+    delay = random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_SECONDS * 2 ** attempt))
+    headers = getattr(error, 'headers', None) or {}
+    try:
+        retry_after = float(headers.get('retry-after') or headers.get('Retry-After') or 0)
+    except (TypeError, ValueError, AttributeError):
+        retry_after = 0
+    return min(LLM_BACKOFF_MAX_SECONDS, max(delay, retry_after))
+
+
+def _throttle(prompt):
+    waited = limiter.acquire(estimate_tokens(prompt))
+    if waited:
+        metrics.record_stage('rate_limit_wait', waited)
+
+
+def _retry_or_raise(attempt, error):
+    if attempt >= LLM_MAX_RETRIES or not is_transient(error):
+        metrics.llm_calls.inc('error')
+        raise error
+    delay = backoff_delay(attempt, error)
+    print(f"Transient LLM error (attempt {attempt + 1}), retrying in {delay:.1f}s: {error}")
+    metrics.llm_calls.inc('retry')
+    time.sleep(delay)
+
+
+def complete(prompt):
+    """Complete prompt with the process-wide backend, rate limited and retried on transient errors"""
+    attempt = 0
+    while True:
+        _throttle(prompt)
+        try:
+            response = get_backend().complete(prompt)
+            metrics.llm_calls.inc('ok')
+            return response
+        except Exception as e:
+            _retry_or_raise(attempt, e)
+            attempt += 1
+
+
+def stream(prompt):
+    """Stream a completion like complete(); a call is only retried if it fails before its first chunk"""
+    attempt = 0
+    while True:
+        _throttle(prompt)
+        try:
+            chunks = iter(get_backend().stream(prompt))
+            first = next(chunks, None)
+            break
+        except Exception as e:
+            _retry_or_raise(attempt, e)
+            attempt += 1
+    metrics.llm_calls.inc('ok')
+    if first is not None:
+        yield first
+    yield from chunks
+
+
+def extract_json(text):
+    """
+    Parse the JSON object in a completion.
+
+    Tolerates markdown code fences and prose around the object by decoding
+    from each '{' in turn until one yields a complete object.
+    """
+    text = (text or '').strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    decoder = json.JSONDecoder()
+    start = text.find('{')
+    while start != -1:
+        try:
+            data, _ = decoder.raw_decode(text, start)
+            return data
+        except ValueError:
+            start = text.find('{', start + 1)
+    raise ValueError("No JSON object found in the model response")
+
+
+def create_backend(name=None):
+    """Create a backend by name ('openai' or 'stub')"""
+    name = (name or LLM_BACKEND).lower()
+    if name == 'openai':
+        return OpenAIBackend()
+    if name == 'stub':
+        return StubBackend()
+    raise ValueError(f"Unknown LLM backend: {name}")
+
+
+def get_backend():
+    """Return the process-wide backend, creating it on first use"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend()
+    return _backend
+
+
+def set_backend(backend):
+    """Replace the process-wide backend (used by benchmarks and tools)"""
+    global _backend
+    with _backend_lock:
+        _backend = backend
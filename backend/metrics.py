@@ -0,0 +1,150 @@
+import os
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+# Set METRICS_ENABLED=false to turn stage timing into a no-op
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+
+# Upper bounds in seconds, from a fast cache lookup up to a slow LLM completion
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_registry = []
+_request = threading.local()
+
+
+def _format_labels(labelnames, values):
+    if not labelnames:
+        return ''
+    pairs = ','.join(f'{name}="{str(value)}"' for name, value in zip(labelnames, values))
+    return '{' + pairs + '}'
+
+
+class Counter:
+    """Monotonic counter, optionally split by label values"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+                for labels, value in sorted(values.items())]
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus exposition format"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._series = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        with self._lock:
+            snapshot = {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+        lines = []
+        for labels, (counts, total) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames + ('le',), labels + (bound,))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            series_labels = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{series_labels} {total}")
+            lines.append(f"{self.name}_count{series_labels} {cumulative}")
+        return lines
+
+
+stage_seconds = Histogram('cv_stage_duration_seconds', 'Time spent in each processing stage', ['stage'])
+request_seconds = Histogram('cv_request_duration_seconds', 'HTTP request duration', ['endpoint', 'status'])
+cv_tokens = Counter('cv_tokens_total', 'CV tokens before and after preprocessing', ['phase'])
+errors = Counter('cv_errors_total', 'Errors and fallbacks by kind', ['kind'])
+llm_calls = Counter('cv_llm_calls_total', 'LLM provider calls by outcome (ok, retry, error, coalesced)', ['outcome'])
+decisions = Counter('cv_decisions_total', 'Analysis decisions', ['decision'])
+
+
+def start_request():
+    """Begin collecting Server-Timing entries for the current request thread"""
+    _request.timings = []
+
+
+def server_timing():
+    """Return the Server-Timing header value for the current request, or None"""
+    timings = getattr(_request, 'timings', None)
+    _request.timings = None
+    if not timings:
+        return None
+    return ', '.join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings)
+
+
+@contextmanager
+def timer(stage):
+    """Time a block as one stage, in the histogram and in the request's Server-Timing header"""
+    if not METRICS_ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+def record_stage(stage, seconds):
+    stage_seconds.observe(seconds, stage)
+    timings = getattr(_request, 'timings', None)
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+def render(gauges=None):
+    """
+    Render every registered metric in the Prometheus text format.
+
+    gauges maps a metric prefix to a stats dict (such as the cache's stats());
+    each numeric value is exported as a '<prefix>_<key>' gauge at scrape time.
+    """
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    for prefix, stats in (gauges or {}).items():
+        for key, value in stats.items():
+            if isinstance(value, bool):
+                value = int(value)
+            if not isinstance(value, (int, float)):
+                continue
+            lines.append(f"# TYPE {prefix}_{key} gauge")
+            lines.append(f"{prefix}_{key} {value}")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,226 @@
+import os
+import re
+import math
+from collections import Counter
+
+# Maximum CV tokens sent to the model; 0 disables the budget
+CV_TOKEN_BUDGET = int(os.environ.get('CV_TOKEN_BUDGET', 2500))
+
+# Canonical section names and the headings that introduce them
+SECTION_HEADINGS = {
+    'summary': ['summary', 'profile', 'professional summary', 'personal statement', 'about me', 'objective', 'career objective'],
+    'experience': ['experience', 'work experience', 'professional experience', 'employment', 'employment history',
+                   'work history', 'career history', 'relevant experience'],
+    'skills': ['skills', 'technical skills', 'key skills', 'core skills', 'core competencies', 'competencies',
+               'tools', 'technologies', 'tools and technologies', 'technical expertise'],
+    'projects': ['projects', 'key projects', 'selected projects'],
+    'certifications': ['certifications', 'certificates', 'qualifications', 'training', 'courses'],
+    'education': ['education', 'academic background', 'education and training'],
+    'community': ['community', 'publications', 'talks', 'volunteering', 'achievements', 'awards'],
+    'interests': ['interests', 'hobbies', 'hobbies and interests', 'personal interests'],
+    'references': ['references', 'referees'],
+}
+
+# Lower numbers are kept first when the CV exceeds the token budget
+SECTION_PRIORITY = {
+    'experience': 0,
+    'skills': 1,
+    'summary': 2,
+    'projects': 3,
+    'certifications': 4,
+    'community': 5,
+    'header': 6,
+    'education': 7,
+    'other': 8,
+    'interests': 9,
+    'references': 10,
+}
+
+# Sections that split the budget between them when they do not all fit, so a long
+# experience section cannot crowd out the skills
+CORE_SECTIONS = ('experience', 'skills')
+
+_HEADING_LOOKUP = {heading: name for name, headings in SECTION_HEADINGS.items() for heading in headings}
+_PAGE_NUMBER = re.compile(r'^(page\s*)?[-(]?\s*\d{1,3}\s*((/|of)\s*\d{1,3})?\s*[-)]?$', re.IGNORECASE)
+
+# tiktoken encoding, loaded on the first count; False once it is known to be unavailable
+_encoding = None
+
+
+def get_encoding():
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding('cl100k_base')
+        except Exception:
+            _encoding = False
+    return _encoding or None
+
+
+def count_tokens(text):
+    """Count tokens with tiktoken when available, otherwise estimate at ~4 characters per token"""
+    if not text:
+        return 0
+    encoding = get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def normalize_whitespace(text):
+    """Normalize line endings and collapse runs of spaces and blank lines, keeping page breaks"""
+    text = text.replace('\r\n', '\n').replace('\r', '\n').replace('\t', ' ')
+    text = re.sub(r'[\u00a0\u2000-\u200b\u202f\u3000]', ' ', text)
+    text = re.sub(r' {2,}', ' ', text)
+    text = re.sub(r' *\n *', '\n', text)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return text.strip()
+
+
+def strip_repeated_lines(text):
+    """Remove page numbers and header/footer lines repeated across form-feed separated pages"""
+    pages = [page.split('\n') for page in text.split('\f')]
+    pages = [[line for line in page if not _PAGE_NUMBER.match(line.strip())] for page in pages]
+    pages = [page for page in pages if any(line.strip() for line in page)]
+
+    if len(pages) >= 2:
+        def edges(page):
+            lines = [line.strip() for line in page if line.strip()]
+            return set(lines[:2] + lines[-2:])
+
+        counts = Counter(line for page in pages for line in edges(page))
+        threshold = max(2, math.ceil(len(pages) / 2))
+        repeated = {line for line, count in counts.items() if count >= threshold}
+        pages = [[line for line in page if line.strip() not in repeated] for page in pages]
+
+    return '\n'.join('\n'.join(page) for page in pages)
+
+
+def section_name(line):
+    """Return the canonical section for a heading line, or None if it is not a heading"""
+    stripped = line.strip().rstrip(':').strip()
+    if not stripped or len(stripped) > 40:
+        return None
+    return _HEADING_LOOKUP.get(re.sub(r'[^a-z ]', '', stripped.lower().replace('&', 'and')).strip())
+
+
+def segment_sections(text):
+    """Split CV text into a list of (section name, text) in document order"""
+    sections = []
+    current_name, current_lines = 'header', []
+    for line in text.split('\n'):
+        name = section_name(line)
+        if name is not None:
+            if any(existing.strip() for existing in current_lines):
+                sections.append((current_name, '\n'.join(current_lines).strip()))
+            current_name, current_lines = name, [line]
+        else:
+            current_lines.append(line)
+    if any(existing.strip() for existing in current_lines):
+        sections.append((current_name, '\n'.join(current_lines).strip()))
+    return sections
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Keep lines from the start of text until max_tokens is reached, cutting the first line that does not fit"""
+    kept, used = [], 0
+    for line in text.split('\n'):
+        tokens = count_tokens(line + '\n')
+        if used + tokens > max_tokens:
+            # Cut rather than drop it, so a single-paragraph section still contributes
+            partial = cut_line(line, max_tokens - used - 1)
+            if partial:
+                kept.append(partial)
+            break
+        kept.append(line)
+        used += tokens
+    return '\n'.join(kept)
+
+
+def cut_line(line, max_tokens):
+    """Cut line to at most max_tokens, at the last word boundary when there is one"""
+    if max_tokens <= 0:
+        return ''
+    encoding = get_encoding()
+    if encoding is not None:
+        cut = encoding.decode(encoding.encode(line)[:max_tokens])
+    else:
+        cut = line[:max_tokens * 4]
+    if len(cut) < len(line) and not line[len(cut)].isspace() and ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    return cut.rstrip().rstrip('\ufffd')
+
+
+def enforce_budget(sections, token_budget):
+    """
+    Fit sections into token_budget, preserving document order.
+
+    CORE_SECTIONS are fitted first, smallest first, each within an equal share of
+    what is left, so the smaller ones are kept whole and the largest is truncated
+    last. If they all fit, the remaining budget goes to the other sections in
+    SECTION_PRIORITY order.
+    """
+    costs = [count_tokens(text) for _, text in sections]
+    if not token_budget or sum(costs) <= token_budget:
+        return sections, False
+
+    core = sorted((i for i, (name, _) in enumerate(sections) if name in CORE_SECTIONS), key=lambda i: (costs[i], i))
+    others = sorted((i for i, (name, _) in enumerate(sections) if name not in CORE_SECTIONS),
+                    key=lambda i: (SECTION_PRIORITY.get(sections[i][0], 8), i))
+    kept = {}
+
+    def fit(index, max_tokens):
+        """Keep section index whole or truncated to max_tokens. Returns the tokens used"""
+        if costs[index] <= max_tokens:
+            kept[index] = sections[index][1]
+            return costs[index]
+        truncated = truncate_to_tokens(sections[index][1], max_tokens)
+        if not truncated.strip():
+            return 0
+        kept[index] = truncated
+        return count_tokens(truncated)
+
+    remaining = token_budget
+    core_fits = True
+    for position, index in enumerate(core):
+        share = remaining // (len(core) - position)
+        core_fits = core_fits and costs[index] <= share
+        remaining -= fit(index, share)
+    for index in others if core_fits else []:
+        if remaining <= 0:
+            break
+        if costs[index] > remaining:
+            fit(index, remaining)
+            break
+        remaining -= fit(index, remaining)
+
+    return [(sections[i][0], kept[i]) for i in range(len(sections)) if i in kept], True
+
+
+def prepare_cv_text(text, token_budget=None):
+    """
+    Clean extracted CV text and fit it into the prompt token budget
+
+    Args:
+        text (str): Raw text from extractors.extract_text
+        token_budget (int): Maximum CV tokens, defaults to CV_TOKEN_BUDGET
+
+    Returns:
+        tuple: (prepared text, stats dict with before/after token counts)
+    """
+    token_budget = CV_TOKEN_BUDGET if token_budget is None else token_budget
+    tokens_before = count_tokens(text)
+
+    cleaned = normalize_whitespace(strip_repeated_lines(normalize_whitespace(text or '')))
+    sections = segment_sections(cleaned)
+    sections, truncated = enforce_budget(sections, token_budget)
+    prepared = '\n\n'.join(section_text for _, section_text in sections)
+
+    stats = {
+        'tokens_before': tokens_before,
+        'tokens_after': count_tokens(prepared),
+        'sections': [name for name, _ in sections],
+        'truncated': truncated,
+    }
+    return prepared, stats
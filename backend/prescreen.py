@@ -0,0 +1,199 @@
+import os
+import re
+import hashlib
+import threading
+import rules
+
+# Local TF-IDF triage run before the LLM; disabled unless PRESCREEN_ENABLED is set
+PRESCREEN_ENABLED = os.environ.get('PRESCREEN_ENABLED', 'false').lower() == 'true'
+# Cosine similarity a category needs before it counts as covered by the CV
+PRESCREEN_MIN_SCORE = float(os.environ.get('PRESCREEN_MIN_SCORE', 0.05))
+# CVs covering fewer categories than this are failed without an LLM call
+PRESCREEN_MIN_CATEGORIES = int(os.environ.get('PRESCREEN_MIN_CATEGORIES', 3))
+
+# Vocabulary that CVs use for each category but that the criteria text rarely spells out
+CATEGORY_KEYWORDS = {
+    "QUALITY_FOCUSED": "quality assurance shift left risk based testing defect prevention testability test strategy test plan "
+                       "test methodology quality gates root cause",
+    "TESTING_KNOWLEDGE": "manual testing exploratory testing regression testing performance testing load testing security testing "
+                         "accessibility testing non functional requirements integration testing acceptance testing bdd tdd",
+    "COLLABORATIVE": "team collaboration cross functional agile scrum pairing knowledge sharing stakeholders facilitated",
+    "TEST_ARCHITECTURE": "test automation framework selenium cypress playwright appium jenkins github actions gitlab ci cd "
+                         "pipeline docker kubernetes architecture tooling",
+    "DEVELOPMENT_SKILLS": "python java javascript typescript c# kotlin sql api rest code review debugging git clean code "
+                          "programming development",
+    "ADAPTABLE": "adaptable pragmatic self organising independent fast paced changing priorities remote asynchronous",
+    "CLIENT_FOCUSED": "client customer stakeholder consultancy consulting business value requirements user needs empathy",
+    "ANALYTICAL": "analytical problem solving detail oriented investigation metrics data analysis continuous learning organised",
+    "COMMUNITY": "mentoring coaching community of practice guild meetup conference talk blog workshop training others",
+}
+
+STOPWORDS = set("""
+a an and are as at be by can for from has have in is it its of on or that the their them they this to with
+who when where which will not but also into across all any both each how other over such than then these those
+""".split())
+
+_TOKEN = re.compile(r'[a-z][a-z0-9+#]*')
+
+_screeners = {}
+_screeners_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_screened = 0
+_skipped = 0
+
+
+def tokenize(text):
+    """Lowercase word tokens with stopwords removed and a light suffix stem"""
+    return [stem(token) for token in _TOKEN.findall((text or '').lower())
+            if token not in STOPWORDS and len(token) >= 2]
+
+
+def stem(token):
+    """Strip -ing/-ed and plural endings so singular and plural forms give the same token"""
+    if len(token) <= 4:
+        return token
+    for suffix in ('ing', 'ed'):
+        if len(token) > len(suffix) + 3 and token.endswith(suffix):
+            return token[:-len(suffix)]
+    if token.endswith('ies'):
+        # technologies -> technology
+        return token[:-3] + 'y'
+    if token.endswith(('sses', 'xes', 'zes', 'ches', 'shes')):
+        # processes -> process, matches -> match
+        return token[:-2]
+    if token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        # pipelines -> pipeline, tests -> test; keeps process, status, analysis
+        return token[:-1]
+    return token
+
+
+class PreScreener:
+    """
+    TF-IDF similarity between a CV and each category description.
+
+    The category matrix is built once per criteria text; scoring a CV is a
+    single sparse-to-dense count and one matrix-vector product.
+    """
+
+    def __init__(self, criteria_text):
+        # NumPy is imported on first use, like the other heavy dependencies
+        import numpy as np
+
+        descriptions = rules.category_descriptions(criteria_text)
+        self.categories = list(rules.CATEGORIES)
+        documents = [
+            tokenize(descriptions.get(category, '') + ' ' + CATEGORY_KEYWORDS.get(category, ''))
+            for category in self.categories
+        ]
+
+        self.vocabulary = {token: index for index, token in enumerate(sorted({t for doc in documents for t in doc}))}
+        document_frequency = np.zeros(len(self.vocabulary))
+        counts = np.zeros((len(self.categories), len(self.vocabulary)))
+        for row, doc in enumerate(documents):
+            for token in doc:
+                counts[row, self.vocabulary[token]] += 1
+            for token in set(doc):
+                document_frequency[self.vocabulary[token]] += 1
+
+        self.idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1
+        weights = np.where(counts > 0, 1 + np.log(np.maximum(counts, 1)), 0) * self.idf
+        norms = np.linalg.norm(weights, axis=1, keepdims=True)
+        self.matrix = weights / np.where(norms == 0, 1, norms)
+
+    def vectorize(self, text):
+        import numpy as np
+
+        vector = np.zeros(len(self.vocabulary))
+        for token in tokenize(text):
+            index = self.vocabulary.get(token)
+            if index is not None:
+                vector[index] += 1
+        vector = np.where(vector > 0, 1 + np.log(np.maximum(vector, 1)), 0) * self.idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def score(self, cv_text):
+        """Return an array of per-category similarity scores in rules.CATEGORIES order"""
+        return self.matrix @ self.vectorize(cv_text)
+
+    def score_batch(self, cv_texts):
+        """Return a (CVs x categories) score matrix"""
+        import numpy as np
+
+        if not cv_texts:
+            return np.zeros((0, len(self.categories)))
+        return np.vstack([self.vectorize(text) for text in cv_texts]) @ self.matrix.T
+
+    def assess(self, cv_text, min_score=None, min_categories=None):
+        """Score a CV and decide whether it clearly fails"""
+        min_score = PRESCREEN_MIN_SCORE if min_score is None else min_score
+        min_categories = PRESCREEN_MIN_CATEGORIES if min_categories is None else min_categories
+
+        scores = self.score(cv_text)
+        covered = [category for category, value in zip(self.categories, scores) if value >= min_score]
+        return {
+            'scores': {category: round(float(value), 4) for category, value in zip(self.categories, scores)},
+            'total': round(float(scores.sum()), 4),
+            'covered': covered,
+            'reject': len(covered) < min_categories,
+        }
+
+
+def get_screener(criteria_text):
+    """Return the PreScreener for criteria_text, building it on first use"""
+    key = hashlib.sha256((criteria_text or '').encode('utf-8')).hexdigest()
+    with _screeners_lock:
+        screener = _screeners.get(key)
+        if screener is None:
+            screener = PreScreener(criteria_text)
+            # Criteria rarely change; keep only a handful of versions around
+            if len(_screeners) >= 8:
+                _screeners.pop(next(iter(_screeners)))
+            _screeners[key] = screener
+        return screener
+
+
+def screen(cv_text, criteria_text):
+    """Assess a CV and update the screened/skipped counters"""
+    global _screened, _skipped
+    assessment = get_screener(criteria_text).assess(cv_text)
+    with _stats_lock:
+        _screened += 1
+        if assessment['reject']:
+            _skipped += 1
+    return assessment
+
+
+def rank(cv_texts, criteria_text):
+    """Return indices of cv_texts ordered from most to least promising"""
+    import numpy as np
+
+    totals = get_screener(criteria_text).score_batch(cv_texts).sum(axis=1)
+    return [int(index) for index in np.argsort(-totals, kind='stable')]
+
+
+def rejection_result(assessment):
+    """Build a FAIL result for a CV rejected by the pre-screen"""
+    missing = [category for category in rules.CATEGORIES if category not in assessment['covered']]
+    return {
+        "decision": "FAIL",
+        "confidence": 90,
+        "justification": [
+            f"Pre-screen: the CV matched only {len(assessment['covered'])} of {len(rules.CATEGORIES)} categories "
+            f"(at least {PRESCREEN_MIN_CATEGORIES} required for a full analysis)"
+        ],
+        "strengths": [],
+        "improvement_areas": [f"No evidence found for {category.replace('_', ' ').title()}" for category in missing][:3],
+        "prescreened": True
+    }
+
+
+def stats():
+    """Return how many CVs were screened and how many LLM calls were skipped"""
+    with _stats_lock:
+        return {
+            'enabled': PRESCREEN_ENABLED,
+            'screened': _screened,
+            'llm_calls_skipped': _skipped,
+            'skip_rate': round(_skipped / _screened, 4) if _screened else 0.0,
+        }
@@ -0,0 +1,165 @@
+"""
+Re-score stored CVs against a criteria version without re-uploading them.
+
+Walks the CV text kept under data/texts (KEEP_CV_TEXT=true) and the raw
+uploads kept under data/uploads (KEEP_UPLOADS=true), runs each through the
+usual preprocessing and analysis against the chosen criteria, and writes one
+JSON file per CV to data/results/rescored/<criteria version>/ with the
+previous decision alongside the new one. Files already written there are
+skipped, so an interrupted run picks up where it stopped.
+
+Usage:
+    python rescore.py [--criteria-file PATH] [--workers N] [--limit N] [--output DIR] [--restart]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+import extractors
+import preprocess
+import results_store
+import uploads
+from analyzer import analyze_cv_cached
+from criteria import CriteriaVersion, registry as criteria_registry
+
+RESCORED_FOLDER = os.path.join(results_store.RESULTS_FOLDER, 'rescored')
+
+# Seconds between progress lines
+PROGRESS_INTERVAL_SECONDS = 5
+
+
+def load_criteria(path=None):
+    """Return the criteria text from a criteria JSON file or plain-text file, or the current criteria"""
+    if not path:
+        return criteria_registry.current().text
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    if path.endswith('.json'):
+        return json.loads(content)['criteria']
+    return content
+
+
+def format_eta(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m{seconds % 60:02d}s"
+
+
+def rescore_one(file_id, path, extension, criteria_text, store, output_folder):
+    """Re-analyze one stored CV and write its result. Returns (new decision, previous decision)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    cv_text, preprocessing = preprocess.prepare_cv_text(extractors.extract_text_from_bytes(data, extension))
+    result, cache_hit = analyze_cv_cached(cv_text, criteria_text)
+    if result.get('decision') == 'ERROR':
+        # Not written, so the next run retries it
+        raise RuntimeError(result.get('justification', ['Analysis failed'])[0])
+
+    previous = store.get(file_id) or {}
+    previous_result = previous.get('result') or {}
+    record = {
+        'id': file_id,
+        'original_filename': previous.get('original_filename'),
+        'timestamp': datetime.now().isoformat(),
+        'criteria_version': CriteriaVersion(criteria_text).version,
+        'source': os.path.relpath(path, results_store.BASE_DIR),
+        'preprocessing': preprocessing,
+        'cached': cache_hit,
+        'result': result,
+        'previous': {
+            'timestamp': previous.get('timestamp'),
+            'criteria_version': previous.get('criteria_version'),
+            'decision': previous_result.get('decision'),
+            'confidence': previous_result.get('confidence'),
+        },
+    }
+
+    target = os.path.join(output_folder, f"{file_id}.json")
+    with open(f"{target}.tmp", 'w') as f:
+        json.dump(record, f)
+    os.replace(f"{target}.tmp", target)
+    return result.get('decision'), previous_result.get('decision')
+
+
+def rescore(criteria_text, workers=4, limit=None, output_folder=None, restart=False):
+    """Re-score every stored CV not yet written to output_folder. Returns a summary dict"""
+    version = CriteriaVersion(criteria_text).version
+    output_folder = output_folder or os.path.join(RESCORED_FOLDER, version)
+    os.makedirs(output_folder, exist_ok=True)
+    with open(os.path.join(output_folder, 'criteria.json'), 'w') as f:
+        json.dump({'criteria': criteria_text, 'version': version}, f)
+
+    sources = uploads.stored_sources()
+    done = set() if restart else {
+        name[:-len('.json')] for name in os.listdir(output_folder)
+        if name.endswith('.json') and name != 'criteria.json'
+    }
+    pending = sorted(file_id for file_id in sources if file_id not in done)
+    if limit:
+        pending = pending[:limit]
+
+    print(f"Criteria version {version}: {len(sources)} stored CVs, {len(done)} already rescored, "
+          f"{len(pending)} to go with {workers} workers -> {output_folder}")
+
+    store = results_store.create_store()
+    summary = {'version': version, 'rescored': 0, 'errors': 0, 'changed': 0, 'passed': 0, 'failed': 0}
+    started = last_report = time.time()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='cv-rescore')
+    try:
+        futures = {
+            executor.submit(rescore_one, file_id, *sources[file_id], criteria_text, store, output_folder): file_id
+            for file_id in pending
+        }
+        for count, future in enumerate(as_completed(futures), 1):
+            try:
+                decision, previous = future.result()
+                summary['rescored'] += 1
+                summary['passed' if decision == 'PASS' else 'failed'] += 1
+                if previous and previous != decision:
+                    summary['changed'] += 1
+            except Exception as e:
+                print(f"Error rescoring {futures[future]}: {e}")
+                summary['errors'] += 1
+
+            now = time.time()
+            if now - last_report >= PROGRESS_INTERVAL_SECONDS or count == len(pending):
+                last_report = now
+                rate = count / (now - started) if now > started else 0.0
+                eta = format_eta((len(pending) - count) / rate) if rate else '?'
+                print(f"{count}/{len(pending)} done, {rate:.2f} CVs/s, ETA {eta}")
+    except KeyboardInterrupt:
+        print("Interrupted; run again to resume from the results written so far")
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+
+    elapsed = time.time() - started
+    summary['elapsed_seconds'] = round(elapsed, 3)
+    summary['cvs_per_second'] = round(summary['rescored'] / elapsed, 3) if elapsed else None
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-score stored CVs against a criteria version")
+    parser.add_argument('--criteria-file', help="criteria JSON ({\"criteria\": ...}) or text file; "
+                                                "defaults to data/criteria.json")
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('RESCORE_WORKERS', 4)),
+                        help="CVs analyzed concurrently (default RESCORE_WORKERS or 4)")
+    parser.add_argument('--limit', type=int, help="rescore at most this many CVs in this run")
+    parser.add_argument('--output', help="output folder (default data/results/rescored/<version>)")
+    parser.add_argument('--restart', action='store_true', help="ignore results already written and rescore everything")
+    args = parser.parse_args(argv)
+
+    try:
+        summary = rescore(load_criteria(args.criteria_file), workers=args.workers, limit=args.limit,
+                          output_folder=args.output, restart=args.restart)
+    except KeyboardInterrupt:
+        return 130
+    print(json.dumps(summary))
+    return 1 if summary['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,273 @@
+import os
+import sys
+import json
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_FOLDER = os.path.join(BASE_DIR, 'data', 'results')
+RESULTS_DB = os.environ.get('RESULTS_DB', os.path.join(BASE_DIR, 'data', 'results.db'))
+
+# "sqlite" (default) or "json" for the original one-file-per-result layout
+RESULTS_STORE = os.environ.get('RESULTS_STORE', 'sqlite').lower()
+
+MAX_PAGE_SIZE = 100
+
+SUMMARY_FIELDS = ('id', 'original_filename', 'timestamp', 'decision', 'confidence', 'criteria_version')
+
+
+def summarize(result_data):
+    """Return the indexed summary fields of a stored result record"""
+    result = result_data.get('result') or {}
+    confidence = result.get('confidence')
+    return {
+        'id': result_data.get('id'),
+        'original_filename': result_data.get('original_filename'),
+        'timestamp': result_data.get('timestamp'),
+        'decision': str(result.get('decision', '')).upper() or None,
+        'confidence': confidence if isinstance(confidence, (int, float)) else None,
+        'criteria_version': result_data.get('criteria_version'),
+    }
+
+
+def _parse_bound(value):
+    """Parse an ISO 8601 date or date-time; date-only values come back as a date"""
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        pass
+    if value.endswith(('Z', 'z')):
+        value = value[:-1] + '+00:00'
+    parsed = datetime.fromisoformat(value)
+    # Stored timestamps are naive local time
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def time_range(since=None, until=None):
+    """
+    Turn since/until query values into (start, end) timestamp strings, start inclusive
+    and end exclusive, either of which may be None. A date-only until covers that whole
+    day. Raises ValueError for values that are not ISO 8601 dates or date-times.
+    """
+    start = end = None
+    if since:
+        start = _parse_bound(since).isoformat()
+    if until:
+        parsed = _parse_bound(until)
+        step = timedelta(microseconds=1) if isinstance(parsed, datetime) else timedelta(days=1)
+        end = (parsed + step).isoformat()
+    return start, end
+
+
+class ResultsStore:
+    """Interface for persisting and querying analysis results"""
+
+    def save(self, result_data):
+        raise NotImplementedError
+
+    def get(self, result_id):
+        """Return the stored record for result_id, or None"""
+        raise NotImplementedError
+
+    def list(self, page=1, per_page=20, decision=None, since=None, until=None,
+             filename=None, criteria_version=None):
+        """
+        Return (summaries, total) for one page of results, newest first. since and until
+        are inclusive ISO 8601 dates or date-times; malformed values raise ValueError
+        """
+        raise NotImplementedError
+
+
+class JsonResultsStore(ResultsStore):
+    """One JSON file per result in data/results. Listing scans the whole directory"""
+
+    def __init__(self, folder=RESULTS_FOLDER):
+        self.folder = folder
+        os.makedirs(self.folder, exist_ok=True)
+
+    def _path(self, result_id):
+        return os.path.join(self.folder, f"{result_id}.json")
+
+    def save(self, result_data):
+        # Write then rename so a status poll never reads a half-written result
+        path = self._path(result_data['id'])
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(result_data, f)
+        os.replace(f"{path}.tmp", path)
+
+    def get(self, result_id):
+        try:
+            with open(self._path(result_id), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def iter_records(self):
+        for name in os.listdir(self.folder):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.folder, name), 'r') as f:
+                    yield json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Skipping unreadable result {name}: {e}")
+
+    def list(self, page=1, per_page=20, decision=None, since=None, until=None,
+             filename=None, criteria_version=None):
+        start, end = time_range(since, until)
+        matches = []
+        for record in self.iter_records():
+            summary = summarize(record)
+            if decision and summary['decision'] != decision.upper():
+                continue
+            if start and (summary['timestamp'] or '') < start:
+                continue
+            if end and (summary['timestamp'] or '') >= end:
+                continue
+            if filename and filename.lower() not in (summary['original_filename'] or '').lower():
+                continue
+            if criteria_version and summary['criteria_version'] != criteria_version:
+                continue
+            matches.append(summary)
+
+        matches.sort(key=lambda summary: summary['timestamp'] or '', reverse=True)
+        start = (page - 1) * per_page
+        return matches[start:start + per_page], len(matches)
+
+
+class SqliteResultsStore(ResultsStore):
+    """SQLite (WAL) store with indexed summary columns and the full record as JSON"""
+
+    INSERT_SQL = ('INTO results (id, original_filename, timestamp, decision, confidence, criteria_version, data) '
+                  'VALUES (?, ?, ?, ?, ?, ?, ?)')
+
+    def __init__(self, path=RESULTS_DB):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.created = not os.path.exists(self.path)
+
+        conn = self._conn()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS results (
+                id TEXT PRIMARY KEY,
+                original_filename TEXT,
+                timestamp TEXT,
+                decision TEXT,
+                confidence REAL,
+                criteria_version TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_results_timestamp ON results (timestamp);
+            CREATE INDEX IF NOT EXISTS idx_results_decision ON results (decision, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_results_confidence ON results (confidence);
+            CREATE INDEX IF NOT EXISTS idx_results_filename ON results (original_filename);
+            CREATE INDEX IF NOT EXISTS idx_results_criteria_version ON results (criteria_version, timestamp);
+        ''')
+        conn.commit()
+
+    def _conn(self):
+        # SQLite connections must not be shared between threads, nor between a gunicorn
+        # --preload master and the workers forked from it (which inherit its thread-locals)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _row(result_data):
+        summary = summarize(result_data)
+        return tuple(summary[field] for field in SUMMARY_FIELDS) + (json.dumps(result_data),)
+
+    def save(self, result_data):
+        conn = self._conn()
+        conn.execute('INSERT OR REPLACE ' + self.INSERT_SQL, self._row(result_data))
+        conn.commit()
+
+    def get(self, result_id):
+        row = self._conn().execute('SELECT data FROM results WHERE id = ?', (result_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list(self, page=1, per_page=20, decision=None, since=None, until=None,
+             filename=None, criteria_version=None):
+        start, end = time_range(since, until)
+        clauses, params = [], []
+        if decision:
+            clauses.append('decision = ?')
+            params.append(decision.upper())
+        if start:
+            clauses.append('timestamp >= ?')
+            params.append(start)
+        if end:
+            clauses.append('timestamp < ?')
+            params.append(end)
+        if filename:
+            escaped = filename.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            clauses.append("original_filename LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        if criteria_version:
+            clauses.append('criteria_version = ?')
+            params.append(criteria_version)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+
+        conn = self._conn()
+        total = conn.execute(f'SELECT COUNT(*) FROM results {where}', params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT {', '.join(SUMMARY_FIELDS)} FROM results {where} ORDER BY timestamp DESC LIMIT ? OFFSET ?",
+            params + [per_page, (page - 1) * per_page]
+        ).fetchall()
+        return [dict(zip(SUMMARY_FIELDS, row)) for row in rows], total
+
+    def migrate_json(self, folder=RESULTS_FOLDER):
+        """Import every JSON result file from folder, skipping ids already present. Returns the count"""
+        if not os.path.isdir(folder):
+            return 0
+        conn = self._conn()
+        imported, rows = 0, []
+        for record in JsonResultsStore(folder).iter_records():
+            if not record.get('id'):
+                continue
+            rows.append(self._row(record))
+            if len(rows) >= 500:
+                imported += self._insert_new(conn, rows)
+                rows = []
+        imported += self._insert_new(conn, rows)
+        return imported
+
+    def _insert_new(self, conn, rows):
+        before = conn.total_changes
+        conn.executemany('INSERT OR IGNORE ' + self.INSERT_SQL, rows)
+        conn.commit()
+        return conn.total_changes - before
+
+
+def create_store(kind=None):
+    """Create the configured results store, migrating JSON results into a new SQLite database"""
+    kind = (kind or RESULTS_STORE).lower()
+    if kind == 'json':
+        return JsonResultsStore()
+    if kind == 'sqlite':
+        store = SqliteResultsStore()
+        if store.created:
+            imported = store.migrate_json()
+            if imported:
+                print(f"Migrated {imported} JSON results into {store.path}")
+        return store
+    raise ValueError(f"Unknown results store: {kind}")
+
+
+if __name__ == '__main__':
+    # Usage: python results_store.py migrate [results_folder]
+    if len(sys.argv) < 2 or sys.argv[1] != 'migrate':
+        print("Usage: python results_store.py migrate [results_folder]")
+        sys.exit(1)
+    folder = sys.argv[2] if len(sys.argv) > 2 else RESULTS_FOLDER
+    count = SqliteResultsStore().migrate_json(folder)
+    print(f"Migrated {count} results from {folder}")
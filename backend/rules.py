@@ -0,0 +1,157 @@
+import re
+
+CATEGORIES = [
+    "QUALITY_FOCUSED",
+    "TESTING_KNOWLEDGE",
+    "COLLABORATIVE",
+    "TEST_ARCHITECTURE",
+    "DEVELOPMENT_SKILLS",
+    "ADAPTABLE",
+    "CLIENT_FOCUSED",
+    "ANALYTICAL",
+    "COMMUNITY",
+]
+
+STRONG = "Strong evidence"
+MODERATE = "Moderate evidence"
+WEAK = "Weak evidence"
+NO_EVIDENCE = "No evidence"
+
+# Categories that must be rated strong for a PASS
+REQUIRED_STRONG = ("TESTING_KNOWLEDGE", "QUALITY_FOCUSED")
+MIN_STRONG = 4
+
+_EXACT_RATINGS = {
+    'strong evidence': STRONG, 'strong': STRONG,
+    'moderate evidence': MODERATE, 'moderate': MODERATE,
+    'weak evidence': WEAK, 'weak': WEAK,
+    'no evidence': NO_EVIDENCE, 'none': NO_EVIDENCE,
+}
+# Weakest first
+_LEVELS = (NO_EVIDENCE, WEAK, MODERATE, STRONG)
+_LEVEL_WORDS = {'weak': WEAK, 'moderate': MODERATE, 'strong': STRONG}
+# A level word, optionally negated by the word before it or the one before that ('not very strong')
+_LEVEL_MENTION = re.compile(
+    r"\b(?:(not|no|never|without|lacks?|lacking|\w+n't)\s+(?:\w+\s+)?)?(strong|moderate|weak)\b"
+)
+_NO_EVIDENCE_MENTION = re.compile(r"\bno evidence\b|^none\b")
+
+_CATEGORY_LINE = re.compile(r'^\s*([A-Z][A-Z ,/&-]+?)\s*:\s*(.+)$')
+_CATEGORY_TAG = re.compile(r'^(.*?)\s*\[([A-Z][A-Z ,/&-]+)\]\s*$', re.DOTALL)
+
+
+def normalize_rating(rating):
+    """
+    Map a free-form model rating onto one of the four levels, erring towards the weaker one.
+
+    The exact labels ('Strong evidence', 'moderate', 'None', ...) map directly. Anything
+    else maps to the weakest level it mentions, so 'Moderate to strong evidence' is
+    moderate. A negated level counts as the level below it ('Not strong' is moderate),
+    while negations elsewhere ('Strong evidence - no gaps') are ignored. Ratings that
+    name no level count as no evidence.
+    """
+    text = ' '.join(str(rating or '').lower().replace('_', ' ').split()).rstrip('.')
+    if text in _EXACT_RATINGS:
+        return _EXACT_RATINGS[text]
+
+    mentioned = []
+    for match in _LEVEL_MENTION.finditer(text):
+        level = _LEVEL_WORDS[match.group(2)]
+        if match.group(1) and level == WEAK:
+            # 'no weak areas' says nothing about how strong the evidence is
+            continue
+        index = _LEVELS.index(level)
+        mentioned.append(index - 1 if match.group(1) else index)
+    if _NO_EVIDENCE_MENTION.search(text):
+        mentioned.append(0)
+    return _LEVELS[min(mentioned)] if mentioned else NO_EVIDENCE
+
+
+def category_key(name):
+    """Map a criteria heading such as 'TEST ARCHITECTURE, TOOLING AND PIPELINE' to its category key"""
+    normalized = re.sub(r'[^A-Z]+', '_', name.upper()).strip('_')
+    for key in CATEGORIES:
+        if normalized.startswith(key):
+            return key
+    return None
+
+
+def category_descriptions(criteria_text):
+    """
+    Split criteria text into per-category descriptions.
+
+    Understands both 'NAME: description' lines and paragraphs ending in a
+    '[NAME]' tag. Categories that cannot be found are left out.
+    """
+    descriptions = {}
+    for block in re.split(r'\n\s*\n|\n(?=\s*[A-Z][A-Z ,/&-]+:)', criteria_text or ''):
+        block = block.strip()
+        if not block:
+            continue
+        match = _CATEGORY_TAG.match(block)
+        if match:
+            key, description = category_key(match.group(2)), match.group(1)
+        else:
+            match = _CATEGORY_LINE.match(block)
+            if not match:
+                continue
+            key, description = category_key(match.group(1)), match.group(2)
+        if key and key not in descriptions:
+            descriptions[key] = ' '.join(description.split())
+    return descriptions
+
+
+def evaluate(category_assessments):
+    """
+    Apply the four PASS rules to a set of category assessments.
+
+    Rules for PASS:
+    1. NO areas assessed as "Weak evidence" or "No evidence"
+    2. Each category must have at least "Moderate evidence"
+    3. At least FOUR categories must be rated as "Strong evidence"
+    4. "TESTING_KNOWLEDGE" and "QUALITY_FOCUSED" MUST be among the categories with "Strong evidence"
+
+    Missing categories count as "No evidence". Confidence follows the bands
+    given to the model: 70-79 for exactly four strong categories, 80-89 for
+    five, 90+ for six or more. A FAIL's confidence grows with the number of
+    rule violations.
+
+    Returns:
+        dict: decision, confidence, ratings per category and the failed rules
+    """
+    ratings = {
+        key: normalize_rating((category_assessments.get(key) or {}).get('rating'))
+        for key in CATEGORIES
+    }
+    strong = [key for key, rating in ratings.items() if rating == STRONG]
+    weak_or_none = [key for key, rating in ratings.items() if rating in (WEAK, NO_EVIDENCE)]
+    missing_required = [key for key in REQUIRED_STRONG if ratings[key] != STRONG]
+
+    failed_rules = []
+    if weak_or_none:
+        # Rules 1 and 2 are violated by the same categories
+        failed_rules.append(f"Weak or no evidence for: {', '.join(weak_or_none)}")
+    if len(strong) < MIN_STRONG:
+        failed_rules.append(f"Strong evidence in only {len(strong)} categories (at least {MIN_STRONG} required)")
+    if missing_required:
+        failed_rules.append(f"Strong evidence required but missing for: {', '.join(missing_required)}")
+
+    if failed_rules:
+        decision = "FAIL"
+        confidence = min(95, 60 + 5 * len(weak_or_none) + 10 * len(missing_required))
+    else:
+        decision = "PASS"
+        if len(strong) >= 6:
+            confidence = min(100, 90 + 2 * (len(strong) - 6))
+        elif len(strong) == 5:
+            confidence = 85
+        else:
+            confidence = 75
+
+    return {
+        "decision": decision,
+        "confidence": confidence,
+        "ratings": ratings,
+        "strong_count": len(strong),
+        "failed_rules": failed_rules,
+    }
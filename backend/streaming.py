@@ -0,0 +1,102 @@
+import json
+
+# Top-level result fields streamed as soon as they are complete; category
+# assessments are streamed one category at a time instead of as a whole
+RESULT_FIELDS = ('decision', 'confidence', 'justification', 'strengths', 'improvement_areas')
+
+_CLOSERS = ',}] \t\r\n'
+
+
+class ResultStreamParser:
+    """
+    Incremental parser for the analysis JSON as it streams from the model.
+
+    feed() takes the next chunk of completion text and returns the fields that
+    finished in it, as (name, value) pairs: one of RESULT_FIELDS, or
+    ('category', (category, assessment)) for each entry of category_assessments.
+    Anything before the opening brace, such as a code fence, is ignored. The
+    full text is kept so the caller can parse and validate the whole result
+    once the stream ends.
+    """
+
+    def __init__(self):
+        self.text = ''
+        self.done = False
+        self._pos = 0
+        # One frame per open container: [kind, current key, expecting a key]
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._value_start = None
+        self._scalar_start = None
+
+    def feed(self, chunk):
+        self.text += chunk
+        fields = []
+        text = self.text
+        while self._pos < len(text) and not self.done:
+            i, c = self._pos, text[self._pos]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._string_end(self._value_start, i + 1, fields)
+                continue
+
+            if self._scalar_start is not None:
+                if c not in _CLOSERS:
+                    continue
+                self._complete(self._scalar_start, i, fields)
+                self._scalar_start = None
+
+            if not self._stack:
+                if c == '{':
+                    self._stack.append(['{', None, True, i])
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._value_start = i
+            elif c in '{[':
+                self._stack.append([c, None, c == '{', i])
+            elif c in '}]':
+                frame = self._stack.pop()
+                if not self._stack:
+                    self.done = True
+                else:
+                    self._complete(frame[3], i + 1, fields)
+            elif c == ':':
+                self._stack[-1][2] = False
+            elif c == ',':
+                if self._stack[-1][0] == '{':
+                    self._stack[-1][2] = True
+            elif not c.isspace():
+                self._scalar_start = i
+        return fields
+
+    def _string_end(self, start, end, fields):
+        frame = self._stack[-1]
+        if frame[0] == '{' and frame[2]:
+            frame[1] = json.loads(self.text[start:end])
+        else:
+            self._complete(start, end, fields)
+
+    def _complete(self, start, end, fields):
+        # Only values directly under the root, or directly under category_assessments, are reported
+        depth = len(self._stack)
+        if depth == 1 and self._stack[0][1] in RESULT_FIELDS:
+            name = self._stack[0][1]
+        elif depth == 2 and self._stack[0][1] == 'category_assessments' and self._stack[1][0] == '{':
+            name = 'category'
+        else:
+            return
+        try:
+            value = json.loads(self.text[start:end])
+        except ValueError:
+            return
+        fields.append(('category', (self._stack[1][1], value)) if name == 'category' else (name, value))
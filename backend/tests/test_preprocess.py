@@ -0,0 +1,74 @@
+import preprocess
+from preprocess import count_tokens, enforce_budget, prepare_cv_text, strip_repeated_lines
+
+PARAGRAPH = ' '.join(f"Led test automation for payments platform {i} using pytest and selenium." for i in range(180))
+EXPERIENCE = 'EXPERIENCE\n' + '\n'.join(f"Senior QA engineer at company {i}, built selenium suites" for i in range(2000))
+SKILLS = 'SKILLS\nSelenium, Cypress, Pytest, Postman, JMeter, Playwright'
+
+
+def sections_of(*texts):
+    return preprocess.segment_sections('\n'.join(texts))
+
+
+def total_tokens(sections):
+    return sum(count_tokens(text) for _, text in sections)
+
+
+def test_sections_within_budget_are_untouched():
+    sections = sections_of('Jane Doe', SKILLS, 'EDUCATION\nBSc Computer Science')
+    assert enforce_budget(sections, 2500) == (sections, False)
+    assert enforce_budget(sections, 0) == (sections, False)
+
+
+def test_long_experience_keeps_skills():
+    sections, truncated = enforce_budget(sections_of('Jane Doe', EXPERIENCE, SKILLS, 'EDUCATION\nBSc'), 100)
+    assert truncated
+    assert [name for name, _ in sections] == ['experience', 'skills']
+    assert dict(sections)['skills'] == SKILLS
+    assert total_tokens(sections) <= 100
+
+
+def test_lower_priority_sections_fill_what_is_left():
+    interests = 'INTERESTS\n' + '\n'.join(f"Hobby number {i}" for i in range(200))
+    sections, truncated = enforce_budget(sections_of('Jane Doe', SKILLS, 'EDUCATION\nBSc', interests), 60)
+    names = [name for name, _ in sections]
+    assert truncated
+    assert names[:3] == ['header', 'skills', 'education']
+    assert total_tokens(sections) <= 60
+
+
+def test_single_paragraph_section_is_cut_not_dropped():
+    sections, truncated = enforce_budget(sections_of('EXPERIENCE', PARAGRAPH, SKILLS), 500)
+    experience = dict(sections)['experience']
+    assert truncated
+    assert experience.startswith('EXPERIENCE\nLed test automation')
+    # Cut at a word boundary
+    assert PARAGRAPH.startswith(experience.split('\n', 1)[1] + ' ')
+    assert dict(sections)['skills'] == SKILLS
+
+
+def test_prepare_cv_text_keeps_a_paragraph_without_headings():
+    prepared, stats = prepare_cv_text(PARAGRAPH, token_budget=2500)
+    assert prepared and PARAGRAPH.startswith(prepared)
+    assert 2400 < stats['tokens_after'] <= 2500
+    assert stats['truncated']
+
+
+def test_strip_repeated_lines_removes_headers_footers_and_page_numbers():
+    pages = [
+        f"Jane Doe - Curriculum Vitae\nExperience line {i}\nMore detail {i}\nConfidential\nPage {i} of 3"
+        for i in range(1, 4)
+    ]
+    lines = strip_repeated_lines('\f'.join(pages)).split('\n')
+    assert 'Jane Doe - Curriculum Vitae' not in lines
+    assert 'Confidential' not in lines
+    assert not any(line.startswith('Page ') for line in lines)
+    assert lines == [f"{kind} {i}" for i in range(1, 4) for kind in ('Experience line', 'More detail')]
+
+
+def test_strip_repeated_lines_keeps_single_page_and_body_repeats():
+    single = "Jane Doe\nSKILLS\nPython\n2"
+    assert strip_repeated_lines(single) == "Jane Doe\nSKILLS\nPython"
+
+    pages = [f"Header {i}\nbody {i}\nPython\nmore {i}\nend {i}\nFooter {i}" for i in range(3)]
+    assert strip_repeated_lines('\f'.join(pages)).split('\n').count('Python') == 3
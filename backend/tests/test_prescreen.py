@@ -0,0 +1,35 @@
+import pytest
+import prescreen
+from criteria import DEFAULT_CRITERIA
+
+SINGULAR = """Designed the deployment pipeline and test automation framework for a payment service.
+Defined the test strategy, risk assessment and quality gate for each release.
+Ran the community of practice and mentored a junior engineer.
+Worked with the client stakeholder on each requirement and business process.
+Wrote python code with a code review for every change and debugged a production issue."""
+
+PLURAL = """Designed deployment pipelines and test automation frameworks for payment services.
+Defined test strategies, risk assessments and quality gates for releases.
+Ran communities of practice and mentored junior engineers.
+Worked with client stakeholders on requirements and business processes.
+Wrote python code with code reviews for all changes and debugged production issues."""
+
+
+@pytest.mark.parametrize('plural, singular', [
+    ('pipelines', 'pipeline'),
+    ('services', 'service'),
+    ('practices', 'practice'),
+    ('processes', 'process'),
+    ('strategies', 'strategy'),
+    ('tests', 'test'),
+])
+def test_plurals_stem_like_singulars(plural, singular):
+    assert prescreen.tokenize(plural) == prescreen.tokenize(singular)
+
+
+def test_plural_cv_covers_the_same_categories():
+    screener = prescreen.PreScreener(DEFAULT_CRITERIA)
+    singular, plural = screener.assess(SINGULAR), screener.assess(PLURAL)
+    assert len(singular['covered']) >= 5
+    assert plural['covered'] == singular['covered']
+    assert plural['scores'] == singular['scores']
@@ -0,0 +1,43 @@
+import pytest
+import results_store
+
+TIMESTAMPS = ['2026-10-16T23:59:59.999999', '2026-10-17T00:00:00', '2026-10-17T18:30:00.250000',
+              '2026-10-18T00:00:00']
+
+
+@pytest.fixture(params=['sqlite', 'json'])
+def store(request, tmp_path):
+    if request.param == 'sqlite':
+        store = results_store.SqliteResultsStore(str(tmp_path / 'results.db'))
+    else:
+        store = results_store.JsonResultsStore(str(tmp_path / 'results'))
+    for i, timestamp in enumerate(TIMESTAMPS):
+        store.save({'id': f'r{i}', 'original_filename': f'cv{i}.pdf', 'timestamp': timestamp,
+                    'result': {'decision': 'PASS', 'confidence': 0.9}})
+    return store
+
+
+def listed(store, **filters):
+    results, total = store.list(**filters)
+    assert total == len(results)
+    return sorted(result['timestamp'] for result in results)
+
+
+def test_date_only_until_covers_the_whole_day(store):
+    assert listed(store, since='2026-10-17', until='2026-10-17') == TIMESTAMPS[1:3]
+
+
+def test_date_time_bounds_are_inclusive(store):
+    assert listed(store, since='2026-10-17T00:00:00', until='2026-10-17T18:30:00.25') == TIMESTAMPS[1:3]
+    assert listed(store, until='2026-10-17T18:30:00') == TIMESTAMPS[:2]
+
+
+@pytest.mark.parametrize('since, until', [('yesterday', None), (None, '17/10/2026'), (None, '2026-13-01')])
+def test_malformed_bounds_are_rejected(store, since, until):
+    with pytest.raises(ValueError):
+        store.list(since=since, until=until)
+
+
+def test_time_range_accepts_utc_suffix():
+    start, end = results_store.time_range('2026-10-17T00:00:00Z')
+    assert start.startswith('2026-10-1') and end is None
@@ -0,0 +1,121 @@
+import pytest
+import rules
+from criteria import DEFAULT_CRITERIA
+from rules import CATEGORIES, MODERATE, NO_EVIDENCE, STRONG, WEAK
+
+
+def assessments(strong=(), **overrides):
+    """Every category at moderate evidence, the given ones strong, then any per-category overrides"""
+    ratings = {key: STRONG if key in strong else MODERATE for key in CATEGORIES}
+    ratings.update(overrides)
+    return {key: {'rating': rating, 'assessment': ''} for key, rating in ratings.items() if rating is not None}
+
+
+REQUIRED = ('TESTING_KNOWLEDGE', 'QUALITY_FOCUSED')
+FOUR_STRONG = REQUIRED + ('COLLABORATIVE', 'ANALYTICAL')
+
+
+@pytest.mark.parametrize('rating, expected', [
+    ('Strong evidence', STRONG),
+    ('strong', STRONG),
+    ('STRONG_EVIDENCE', STRONG),
+    ('Moderate evidence.', MODERATE),
+    ('Weak evidence', WEAK),
+    ('No evidence', NO_EVIDENCE),
+    ('None', NO_EVIDENCE),
+    (None, NO_EVIDENCE),
+    ('Moderate to strong evidence', MODERATE),
+    ('Weak to moderate', WEAK),
+    ('Weak to no evidence', NO_EVIDENCE),
+    ('Not strong', MODERATE),
+    ('Not very strong', MODERATE),
+    ("Doesn't show strong evidence", MODERATE),
+    ('No strong evidence', MODERATE),
+    ('Not moderate', WEAK),
+    ('Not weak', NO_EVIDENCE),
+    ('Strong evidence - no gaps', STRONG),
+    ('Strong evidence, but not quantified', STRONG),
+    ('Moderate evidence (no metrics given)', MODERATE),
+    ('Strong evidence with no weak areas', STRONG),
+    ('Excellent', NO_EVIDENCE),
+])
+def test_normalize_rating(rating, expected):
+    assert rules.normalize_rating(rating) == expected
+
+
+@pytest.mark.parametrize('strong, confidence', [
+    (FOUR_STRONG, 75),
+    (FOUR_STRONG + ('ADAPTABLE',), 85),
+    (FOUR_STRONG + ('ADAPTABLE', 'COMMUNITY'), 90),
+    (tuple(CATEGORIES), 96),
+])
+def test_pass_confidence_bands(strong, confidence):
+    result = rules.evaluate(assessments(strong))
+    assert result['decision'] == 'PASS'
+    assert result['confidence'] == confidence
+    assert result['failed_rules'] == []
+
+
+@pytest.mark.parametrize('rating', [WEAK, NO_EVIDENCE])
+def test_weak_or_no_evidence_fails(rating):
+    result = rules.evaluate(assessments(tuple(CATEGORIES), COMMUNITY=rating))
+    assert result['decision'] == 'FAIL'
+    assert result['failed_rules'] == ['Weak or no evidence for: COMMUNITY']
+
+
+def test_missing_category_counts_as_no_evidence():
+    result = rules.evaluate(assessments(FOUR_STRONG, ADAPTABLE=None))
+    assert result['decision'] == 'FAIL'
+    assert result['ratings']['ADAPTABLE'] == NO_EVIDENCE
+
+
+def test_fewer_than_four_strong_fails():
+    result = rules.evaluate(assessments(REQUIRED + ('ANALYTICAL',)))
+    assert result['decision'] == 'FAIL'
+    assert result['strong_count'] == 3
+    assert len(result['failed_rules']) == 1
+
+
+def test_required_categories_must_be_strong():
+    strong = tuple(key for key in CATEGORIES if key != 'TESTING_KNOWLEDGE')
+    result = rules.evaluate(assessments(strong))
+    assert result['decision'] == 'FAIL'
+    assert result['failed_rules'] == ['Strong evidence required but missing for: TESTING_KNOWLEDGE']
+
+
+def test_hedged_rating_does_not_count_as_strong():
+    result = rules.evaluate(assessments(FOUR_STRONG, ANALYTICAL='Moderate to strong evidence'))
+    assert result['decision'] == 'FAIL'
+
+
+def test_remarks_after_a_level_do_not_lower_it():
+    result = rules.evaluate(assessments(FOUR_STRONG, TESTING_KNOWLEDGE='Strong evidence - no gaps',
+                                        ANALYTICAL='Strong evidence, but not quantified',
+                                        COMMUNITY='Moderate evidence (no metrics given)'))
+    assert result['decision'] == 'PASS'
+
+
+def test_fail_confidence_grows_with_violations():
+    one = rules.evaluate(assessments(FOUR_STRONG, COMMUNITY=WEAK))
+    many = rules.evaluate(assessments(ADAPTABLE=WEAK, COMMUNITY=NO_EVIDENCE))
+    assert one['confidence'] < many['confidence'] <= 95
+
+
+def test_category_descriptions_from_default_criteria():
+    descriptions = rules.category_descriptions(DEFAULT_CRITERIA)
+    assert list(descriptions) == CATEGORIES
+    assert descriptions['TEST_ARCHITECTURE'].startswith('Tool selection')
+
+
+def test_category_descriptions_from_tagged_paragraphs():
+    criteria = """Thinks about risk early and designs for testability.
+    [QUALITY FOCUSED]
+
+    Chooses tools and shapes the pipeline
+    with the team. [TEST ARCHITECTURE, TOOLING AND PIPELINE]
+
+    Likes cats. [PETS]"""
+    assert rules.category_descriptions(criteria) == {
+        'QUALITY_FOCUSED': 'Thinks about risk early and designs for testability.',
+        'TEST_ARCHITECTURE': 'Chooses tools and shapes the pipeline with the team.',
+    }
@@ -0,0 +1,111 @@
+import os
+import time
+import threading
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UPLOAD_FOLDER = os.path.join(BASE_DIR, 'data', 'uploads')
+TEXT_FOLDER = os.path.join(BASE_DIR, 'data', 'texts')
+
+# Raw uploads are only written to disk when explicitly requested
+KEEP_UPLOADS = os.environ.get('KEEP_UPLOADS', 'false').lower() == 'true'
+# Extracted CV text is much smaller than the upload and is enough for offline re-scoring
+KEEP_CV_TEXT = os.environ.get('KEEP_CV_TEXT', 'false').lower() == 'true'
+UPLOAD_RETENTION_DAYS = float(os.environ.get('UPLOAD_RETENTION_DAYS', 30))
+UPLOAD_MAX_FILES = int(os.environ.get('UPLOAD_MAX_FILES', 10000))
+
+# Minimum seconds between retention sweeps
+PRUNE_INTERVAL_SECONDS = 600
+
+_last_prune = 0.0
+_prune_lock = threading.Lock()
+
+
+def save_upload(data, file_id, extension):
+    """Persist raw upload bytes if KEEP_UPLOADS is enabled. Returns the path or None"""
+    if not KEEP_UPLOADS:
+        return None
+
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    path = os.path.join(UPLOAD_FOLDER, f"{file_id}.{extension}")
+    with open(path, 'wb') as f:
+        f.write(data)
+
+    maybe_prune()
+    return path
+
+
+def save_text(cv_text, file_id):
+    """Persist extracted CV text if KEEP_CV_TEXT is enabled. Returns the path or None"""
+    if not KEEP_CV_TEXT:
+        return None
+
+    os.makedirs(TEXT_FOLDER, exist_ok=True)
+    path = os.path.join(TEXT_FOLDER, f"{file_id}.txt")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(cv_text)
+
+    maybe_prune()
+    return path
+
+
+def stored_sources():
+    """Map each stored result id to its kept text file, or else its kept upload, as (path, extension)"""
+    sources = {}
+    for folder in (UPLOAD_FOLDER, TEXT_FOLDER):
+        try:
+            names = os.listdir(folder)
+        except FileNotFoundError:
+            continue
+        for name in names:
+            file_id, _, extension = name.rpartition('.')
+            if file_id and extension in ('pdf', 'docx', 'txt'):
+                # Text files are listed last, so they win over the original upload
+                sources[file_id] = (os.path.join(folder, name), extension)
+    return sources
+
+
+def maybe_prune():
+    """Run a retention sweep if the last one was long enough ago"""
+    global _last_prune
+    with _prune_lock:
+        now = time.time()
+        if now - _last_prune < PRUNE_INTERVAL_SECONDS:
+            return
+        _last_prune = now
+    prune_uploads()
+
+
+def prune_uploads(retention_days=None, max_files=None):
+    """Delete kept uploads and CV text older than the retention period and the oldest beyond max_files"""
+    return sum(prune_folder(folder, retention_days, max_files) for folder in (UPLOAD_FOLDER, TEXT_FOLDER))
+
+
+def prune_folder(folder, retention_days=None, max_files=None):
+    retention_days = UPLOAD_RETENTION_DAYS if retention_days is None else retention_days
+    max_files = UPLOAD_MAX_FILES if max_files is None else max_files
+
+    try:
+        names = os.listdir(folder)
+    except FileNotFoundError:
+        return 0
+
+    entries = []
+    for name in names:
+        path = os.path.join(folder, name)
+        try:
+            entries.append((os.path.getmtime(path), path))
+        except OSError:
+            continue
+
+    entries.sort()
+    cutoff = time.time() - retention_days * 86400 if retention_days > 0 else None
+    excess = len(entries) - max_files if max_files > 0 else 0
+    removed = 0
+    for index, (mtime, path) in enumerate(entries):
+        if index < excess or (cutoff is not None and mtime < cutoff):
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
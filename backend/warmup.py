@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+
+# Set WARMUP_LLM=false to leave the LLM stack (LangChain, openai) to the first request
+WARMUP_LLM = os.environ.get('WARMUP_LLM', 'true').lower() == 'true'
+
+
+def _timed(timings, name, fn):
+    started = time.perf_counter()
+    fn()
+    timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def _extraction_stack():
+    # Import only: the extraction process pool must be created by each worker after the fork
+    import docx2txt  # noqa: F401
+    import pdfminer.high_level  # noqa: F401
+    import pdfminer.layout  # noqa: F401
+
+
+def _llm_stack():
+    import analyzer
+    for name in analyzer.PROMPT_TEMPLATES:
+        analyzer.get_prompt(name)
+    # Import the client modules without building the client, which needs the API key
+    # and opens a connection pool that should not be shared across forked workers
+    if analyzer.get_backend().model_name != 'stub':
+        import openai  # noqa: F401
+        from langchain_community.chat_models import ChatOpenAI  # noqa: F401
+
+
+def _prescreen():
+    import prescreen
+    from criteria import registry
+    prescreen.get_screener(registry.current().text)
+
+
+def _preprocess():
+    import preprocess
+    preprocess.get_encoding()
+
+
+def warm_up():
+    """
+    Import the heavy dependencies and build the per-criteria state ahead of the first request.
+
+    Meant for the gunicorn master with --preload (see gunicorn.conf.py), so
+    forked workers share the loaded modules copy-on-write. Nothing here starts
+    threads, processes or connections. Returns the milliseconds spent per step.
+    """
+    timings = {}
+    _timed(timings, 'extraction', _extraction_stack)
+    if WARMUP_LLM:
+        _timed(timings, 'llm', _llm_stack)
+    _timed(timings, 'prescreen', _prescreen)
+    _timed(timings, 'preprocess', _preprocess)
+    return timings
+
+
+if __name__ == '__main__':
+    # Usage: python warmup.py -- reports the app import time, time to the first health
+    # check response and the cost of each warm-up step, in a fresh interpreter
+    started = time.perf_counter()
+    import app
+    imported = time.perf_counter()
+    response = app.app.test_client().get('/api/health')
+    ready = time.perf_counter()
+    steps = warm_up()
+    print(f"import app: {(imported - started) * 1000:.0f}ms")
+    print(f"first /api/health ({response.status_code}): {(ready - started) * 1000:.0f}ms after start")
+    print(f"warm-up: {sum(steps.values()):.0f}ms " + ', '.join(f"{name} {ms:.0f}ms" for name, ms in steps.items()))
+    sys.exit(0)